@@ -1,11 +1,13 @@
 from .__version__ import __description__, __title__, __version__
 from .api import delete, get, head, options, patch, post, put, request
 from .client import AsyncClient, Client
-from .concurrency.asyncio import AsyncioBackend
+from .concurrency.asyncio import AsyncioBackend, Resolver
 from .concurrency.base import (
     BaseBackgroundManager,
     BasePoolSemaphore,
+    BaseResolver,
     BaseStream,
+    BaseTask,
     ConcurrencyBackend,
 )
 from .config import (
@@ -37,6 +39,7 @@ from .exceptions import (
     StreamConsumed,
     Timeout,
     TooManyRedirects,
+    TotalTimeout,
     WriteTimeout,
 )
 from .models import (
@@ -78,6 +81,7 @@ __all__ = [
     "AsyncClient",
     "Client",
     "AsyncioBackend",
+    "Resolver",
     "USER_AGENT",
     "CertTypes",
     "PoolLimits",
@@ -86,6 +90,7 @@ __all__ = [
     "VerifyTypes",
     "HTTPConnection",
     "BasePoolSemaphore",
+    "BaseResolver",
     "BaseBackgroundManager",
     "ConnectionPool",
     "ConnectTimeout",
@@ -102,9 +107,11 @@ __all__ = [
     "StreamConsumed",
     "Timeout",
     "TooManyRedirects",
+    "TotalTimeout",
     "WriteTimeout",
     "AsyncDispatcher",
     "BaseStream",
+    "BaseTask",
     "ConcurrencyBackend",
     "Dispatcher",
     "URL",
@@ -14,6 +14,7 @@ from .config import (
     CertTypes,
     HTTPVersionTypes,
     PoolLimits,
+    TimeoutConfig,
     TimeoutTypes,
     VerifyTypes,
 )
@@ -28,6 +29,7 @@ from .exceptions import (
     RedirectBodyUnavailable,
     RedirectLoop,
     TooManyRedirects,
+    TotalTimeout,
 )
 from .models import (
     URL,
@@ -68,6 +70,7 @@ class BaseClient:
         app: typing.Callable = None,
         backend: ConcurrencyBackend = None,
         trust_env: bool = None,
+        preconnect: typing.Sequence[URLTypes] = None,
     ):
         if backend is None:
             backend = AsyncioBackend()
@@ -105,9 +108,11 @@ class BaseClient:
         self.headers = Headers(headers)
         self.cookies = Cookies(cookies)
         self.max_redirects = max_redirects
+        self.timeout = TimeoutConfig(timeout)
         self.dispatch = async_dispatch
         self.concurrency_backend = backend
         self.trust_env = True if trust_env is None else trust_env
+        self.preconnect_urls = [] if preconnect is None else list(preconnect)
 
     def check_concurrency_backend(self, backend: ConcurrencyBackend) -> None:
         pass  # pragma: no cover
@@ -118,6 +123,17 @@ class BaseClient:
             url = url.copy_with(scheme="https")
         return url
 
+    def preconnect_counts(self) -> typing.Dict[URL, int]:
+        """
+        Return the number of connections to open for each of the URLs in the
+        `preconnect` option, when the client is first used as a context manager.
+        """
+        counts: typing.Dict[URL, int] = {}
+        for url in self.preconnect_urls:
+            merged_url = self.merge_url(url)
+            counts[merged_url] = counts.get(merged_url, 0) + 1
+        return counts
+
     def merge_cookies(
         self, cookies: CookieTypes = None
     ) -> typing.Optional[CookieTypes]:
@@ -172,25 +188,31 @@ class BaseClient:
                 auth = HTTPBasicAuth(username=auth[0], password=auth[1])
             request = auth(request)
 
+        timeout_config = self.timeout if timeout is None else TimeoutConfig(timeout)
+        deadline = self.concurrency_backend.deadline(
+            timeout_config.total_timeout, TotalTimeout
+        )
+
         try:
-            response = await self.send_handling_redirects(
-                request,
-                verify=verify,
-                cert=cert,
-                timeout=timeout,
-                allow_redirects=allow_redirects,
-            )
+            with deadline:
+                response = await self.send_handling_redirects(
+                    request,
+                    verify=verify,
+                    cert=cert,
+                    timeout=timeout,
+                    allow_redirects=allow_redirects,
+                )
+
+                if not stream:
+                    try:
+                        await response.read()
+                    finally:
+                        await response.close()
         except HTTPError as exc:
             # Add the original request to any HTTPError
             exc.request = request
             raise
 
-        if not stream:
-            try:
-                await response.read()
-            finally:
-                await response.close()
-
         return response
 
     async def send_handling_redirects(
@@ -611,10 +633,19 @@ class AsyncClient(BaseClient):
         )
         return response
 
+    async def preconnect(self, url: URLTypes, count: int = 1) -> None:
+        """
+        Open `count` connections to the given URL in parallel, completing any
+        TLS handshakes, so that subsequent requests can reuse them.
+        """
+        await self.dispatch.preconnect(self.merge_url(url), count=count)
+
     async def close(self) -> None:
         await self.dispatch.close()
 
     async def __aenter__(self) -> "AsyncClient":
+        for url, count in self.preconnect_counts().items():
+            await self.dispatch.preconnect(url, count=count)
         return self
 
     async def __aexit__(
@@ -971,11 +1002,21 @@ class Client(BaseClient):
             trust_env=trust_env,
         )
 
+    def preconnect(self, url: URLTypes, count: int = 1) -> None:
+        """
+        Open `count` connections to the given URL in parallel, completing any
+        TLS handshakes, so that subsequent requests can reuse them.
+        """
+        coroutine = self.dispatch.preconnect
+        self.concurrency_backend.run(coroutine, self.merge_url(url), count=count)
+
     def close(self) -> None:
         coroutine = self.dispatch.close
         self.concurrency_backend.run(coroutine)
 
     def __enter__(self) -> "Client":
+        for url, count in self.preconnect_counts().items():
+            self.preconnect(url, count=count)
         return self
 
     def __exit__(
@@ -2,14 +2,20 @@
 The `Stream` class here provides a lightweight layer over
 `asyncio.StreamReader` and `asyncio.StreamWriter`.
 
-Similarly `PoolSemaphore` is a lightweight layer over `BoundedSemaphore`.
+Similarly `PoolSemaphore` provides a bounded semaphore with an ordered queue
+of waiters, for use by the connection pool, and `Resolver` provides cached
+hostname lookups.
 
 These classes help encapsulate the timeout logic, make it easier to unit-test
 protocols, and help keep the rest of the package more `async`/`await`
 based, and less strictly `asyncio`-specific.
 """
+
 import asyncio
 import functools
+import heapq
+import itertools
+import socket
 import ssl
 import typing
 from types import TracebackType
@@ -21,13 +27,26 @@ from .base import (
     BasePoolSemaphore,
     BaseEvent,
     BaseQueue,
+    BaseResolver,
     BaseStream,
+    BaseTask,
     ConcurrencyBackend,
     TimeoutFlag,
 )
 
 SSL_MONKEY_PATCH_APPLIED = False
 
+# The delay before starting a connection attempt to the next address, as
+# recommended by RFC 8305 ("Happy Eyeballs").
+HAPPY_EYEBALLS_DELAY = 0.25
+
+AddressInfo = typing.Tuple[int, int, int, str, typing.Any]
+
+try:
+    current_task = asyncio.current_task
+except AttributeError:  # pragma: no cover
+    current_task = asyncio.Task.current_task  # type: ignore  # Python 3.6
+
 
 def ssl_monkey_patch() -> None:
     """
@@ -50,6 +69,106 @@ def ssl_monkey_patch() -> None:
     MonkeyPatch.write = _fixed_write
 
 
+def interleave_addresses(
+    addresses: typing.Sequence[AddressInfo], first_family_count: int = 1
+) -> typing.List[AddressInfo]:
+    """
+    Reorder resolved addresses so that address families alternate, starting
+    with `first_family_count` addresses of whichever family came first.
+    See RFC 8305, section 4.
+    """
+    by_family: typing.Dict[int, typing.List[AddressInfo]] = {}
+    for address in addresses:
+        by_family.setdefault(address[0], []).append(address)
+    families = list(by_family.values())
+
+    reordered = families[0][: first_family_count - 1]
+    families[0] = families[0][first_family_count - 1 :]
+    for group in itertools.zip_longest(*families):
+        reordered.extend(address for address in group if address is not None)
+    return reordered
+
+
+class IOTimeout:
+    """
+    Enforces a timeout on the current task, by scheduling a single timer with
+    `loop.call_at()` that cancels the task if it fires. This avoids the extra
+    task that `asyncio.wait_for()` would create for every read or write.
+
+    If a timeout flag is given, then the timer is only armed while the flag
+    is in the matching mode, and is armed or disarmed as soon as the flag
+    switches over, rather than polling the flag for changes.
+
+    Timeouts may be nested, for instance a read timeout within a total
+    timeout for the request. Only the first one to expire cancels the task.
+    """
+
+    # Tasks that have been cancelled by an expired timeout, but which have
+    # not yet seen the resulting `CancelledError`.
+    expired_tasks: typing.Set[asyncio.Task] = set()
+
+    def __init__(
+        self,
+        timeout: typing.Optional[float],
+        flag: typing.Optional[TimeoutFlag],
+        exc_class: typing.Type[Exception],
+    ) -> None:
+        self.timeout = timeout
+        self.flag = flag
+        self.exc_class = exc_class
+        self.loop = asyncio.get_event_loop()
+        self.task = typing.cast(asyncio.Task, current_task())
+        self.handle: typing.Optional[asyncio.TimerHandle] = None
+        self.expired = False
+
+    def is_enforced(self) -> bool:
+        if self.flag is None:
+            return True
+        if self.exc_class is ReadTimeout:
+            return self.flag.raise_on_read_timeout
+        return self.flag.raise_on_write_timeout
+
+    def update(self) -> None:
+        if not self.is_enforced():
+            self.disarm()
+        elif self.handle is None and self.timeout is not None:
+            self.handle = self.loop.call_at(
+                self.loop.time() + self.timeout, self.expire
+            )
+
+    def disarm(self) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def expire(self) -> None:
+        self.handle = None
+        self.expired = True
+        if self.task not in self.expired_tasks:
+            self.expired_tasks.add(self.task)
+            self.task.cancel()
+
+    def __enter__(self) -> "IOTimeout":
+        if self.flag is not None:
+            self.flag.add_listener(self.update)
+        self.update()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: typing.Type[BaseException] = None,
+        exc_value: BaseException = None,
+        traceback: TracebackType = None,
+    ) -> None:
+        if self.flag is not None:
+            self.flag.remove_listener(self.update)
+        self.disarm()
+        if self.expired:
+            self.expired_tasks.discard(self.task)
+            if exc_type is asyncio.CancelledError:
+                raise self.exc_class() from None
+
+
 class Stream(BaseStream):
     def __init__(
         self,
@@ -60,6 +179,9 @@ class Stream(BaseStream):
         self.stream_reader = stream_reader
         self.stream_writer = stream_writer
         self.timeout = timeout
+        # Keep hold of the SSL object, so that we can still get at the TLS
+        # session once the transport has been closed.
+        self.ssl_object = stream_writer.get_extra_info("ssl_object")
 
     def get_http_version(self) -> str:
         ssl_object = self.stream_writer.get_extra_info("ssl_object")
@@ -73,28 +195,23 @@ class Stream(BaseStream):
 
         return "HTTP/2" if ident == "h2" else "HTTP/1.1"
 
+    def get_ssl_session(self) -> typing.Optional[ssl.SSLSession]:
+        return None if self.ssl_object is None else self.ssl_object.session
+
+    def is_ssl_session_reused(self) -> bool:
+        return self.ssl_object is not None and self.ssl_object.session_reused
+
     async def read(
         self, n: int, timeout: TimeoutConfig = None, flag: TimeoutFlag = None
     ) -> bytes:
         if timeout is None:
             timeout = self.timeout
 
-        while True:
-            # Check our flag at the first possible moment, and use a fine
-            # grained retry loop if we're not yet in read-timeout mode.
-            should_raise = flag is None or flag.raise_on_read_timeout
-            read_timeout = timeout.read_timeout if should_raise else 0.01
-            try:
-                data = await asyncio.wait_for(self.stream_reader.read(n), read_timeout)
-                break
-            except asyncio.TimeoutError:
-                if should_raise:
-                    raise ReadTimeout() from None
-
-        return data
+        with IOTimeout(timeout.read_timeout, flag, ReadTimeout):
+            return await self.stream_reader.read(n)
 
     def write_no_block(self, data: bytes) -> None:
-        self.stream_writer.write(data)  # pragma: nocover
+        self.stream_writer.write(data)
 
     async def write(
         self, data: bytes, timeout: TimeoutConfig = None, flag: TimeoutFlag = None
@@ -106,19 +223,8 @@ class Stream(BaseStream):
             timeout = self.timeout
 
         self.stream_writer.write(data)
-        while True:
-            try:
-                await asyncio.wait_for(  # type: ignore
-                    self.stream_writer.drain(), timeout.write_timeout
-                )
-                break
-            except asyncio.TimeoutError:
-                # We check our flag at the possible moment, in order to
-                # allow us to suppress write timeouts, if we've since
-                # switched over to read-timeout mode.
-                should_raise = flag is None or flag.raise_on_write_timeout
-                if should_raise:
-                    raise WriteTimeout() from None
+        with IOTimeout(timeout.write_timeout, flag, WriteTimeout):
+            await self.stream_writer.drain()
 
     def is_connection_dropped(self) -> bool:
         return self.stream_reader.at_eof()
@@ -127,41 +233,496 @@ class Stream(BaseStream):
         self.stream_writer.close()
 
 
-class PoolSemaphore(BasePoolSemaphore):
-    def __init__(self, pool_limits: PoolLimits):
-        self.pool_limits = pool_limits
+# `asyncio.BufferedProtocol` is not available on Python 3.6, in which case
+# the transport passes us data with `data_received()` instead.
+BufferedProtocol = getattr(asyncio, "BufferedProtocol", asyncio.Protocol)
+
+
+class StreamProtocol(BufferedProtocol):  # type: ignore
+    """
+    Receives data directly into a single reusable buffer, which `ProtocolStream`
+    reads from, and tracks the transport's write flow control.
+    """
+
+    # The initial size of the receive buffer. It grows if we need to hold
+    # more unread data than this.
+    BUFFER_SIZE = 64 * 1024
+
+    # Stop reading from the transport once this much data is unread.
+    HIGH_WATER_MARK = 256 * 1024
+
+    def __init__(self) -> None:
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self.start = 0
+        self.end = 0
+        self.transport: typing.Optional[asyncio.Transport] = None
+        self.reading_paused = False
+        self.writing_paused = False
+        self.eof = False
+        self.exc: typing.Optional[BaseException] = None
+        self.read_waiter: typing.Optional[asyncio.Future] = None
+        self.drain_waiter: typing.Optional[asyncio.Future] = None
 
     @property
-    def semaphore(self) -> typing.Optional[asyncio.BoundedSemaphore]:
-        if not hasattr(self, "_semaphore"):
-            max_connections = self.pool_limits.hard_limit
-            if max_connections is None:
-                self._semaphore = None
+    def num_unread(self) -> int:
+        return self.end - self.start
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = typing.cast(asyncio.Transport, transport)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        sizehint = max(sizehint, 1)
+        if len(self.buffer) - self.end < sizehint:
+            # Move any unread data to the front of the buffer, and grow the
+            # buffer if that doesn't leave enough space.
+            unread = self.num_unread
+            if len(self.buffer) - unread < sizehint:
+                new_buffer = bytearray(max(len(self.buffer) * 2, unread + sizehint))
+                new_buffer[:unread] = self.buffer[self.start : self.end]
+                self.buffer = new_buffer
             else:
-                self._semaphore = asyncio.BoundedSemaphore(value=max_connections)
-        return self._semaphore
+                self.buffer[:unread] = self.buffer[self.start : self.end]
+            self.start, self.end = 0, unread
+        return memoryview(self.buffer)[self.end :]
+
+    def data_received(self, data: bytes) -> None:
+        nbytes = len(data)
+        self.get_buffer(nbytes)[:nbytes] = data
+        self.buffer_updated(nbytes)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.end += nbytes
+        if self.num_unread >= self.HIGH_WATER_MARK and not self.reading_paused:
+            assert self.transport is not None
+            self.transport.pause_reading()
+            self.reading_paused = True
+        self.wake_reader()
+
+    def eof_received(self) -> None:
+        self.eof = True
+        self.wake_reader()
+
+    def connection_lost(self, exc: typing.Optional[Exception]) -> None:
+        self.eof = True
+        self.exc = exc
+        self.wake_reader()
+        self.writing_paused = False
+        if self.drain_waiter is not None and not self.drain_waiter.done():
+            self.drain_waiter.set_result(None)
+
+    def pause_writing(self) -> None:
+        self.writing_paused = True
+
+    def resume_writing(self) -> None:
+        self.writing_paused = False
+        if self.drain_waiter is not None and not self.drain_waiter.done():
+            self.drain_waiter.set_result(None)
+
+    def wake_reader(self) -> None:
+        if self.read_waiter is not None and not self.read_waiter.done():
+            self.read_waiter.set_result(None)
+
+    def read_buffered(self, n: int) -> bytes:
+        stop = min(self.start + n, self.end)
+        data = bytes(memoryview(self.buffer)[self.start : stop])
+        self.start = stop
+        if self.start == self.end:
+            self.start = self.end = 0
+        if self.reading_paused and self.num_unread < self.HIGH_WATER_MARK // 2:
+            assert self.transport is not None
+            self.transport.resume_reading()
+            self.reading_paused = False
+        return data
 
-    async def acquire(self) -> None:
-        if self.semaphore is None:
+
+class ProtocolStream(BaseStream):
+    """
+    A stream built directly on `asyncio.BufferedProtocol`, rather than on
+    `asyncio.StreamReader` and `asyncio.StreamWriter`.
+
+    The transport receives data straight into the protocol's buffer, so each
+    read makes a single copy, and writes only wait on the transport's flow
+    control when it has actually asked us to pause writing.
+    """
+
+    def __init__(self, protocol: StreamProtocol, timeout: TimeoutConfig):
+        assert protocol.transport is not None
+        self.protocol = protocol
+        self.transport = protocol.transport
+        self.timeout = timeout
+        self.ssl_object = self.transport.get_extra_info("ssl_object")
+
+    def get_http_version(self) -> str:
+        if self.ssl_object is None:
+            return "HTTP/1.1"
+
+        ident = self.ssl_object.selected_alpn_protocol()
+        if ident is None:
+            ident = self.ssl_object.selected_npn_protocol()
+
+        return "HTTP/2" if ident == "h2" else "HTTP/1.1"
+
+    def get_ssl_session(self) -> typing.Optional[ssl.SSLSession]:
+        return None if self.ssl_object is None else self.ssl_object.session
+
+    def is_ssl_session_reused(self) -> bool:
+        return self.ssl_object is not None and self.ssl_object.session_reused
+
+    async def read(
+        self, n: int, timeout: TimeoutConfig = None, flag: TimeoutFlag = None
+    ) -> bytes:
+        if timeout is None:
+            timeout = self.timeout
+
+        protocol = self.protocol
+        if not protocol.num_unread and not protocol.eof:
+            protocol.read_waiter = asyncio.get_event_loop().create_future()
+            try:
+                with IOTimeout(timeout.read_timeout, flag, ReadTimeout):
+                    await protocol.read_waiter
+            finally:
+                protocol.read_waiter = None
+
+        if not protocol.num_unread and protocol.exc is not None:
+            raise protocol.exc
+        return protocol.read_buffered(n)
+
+    def write_no_block(self, data: bytes) -> None:
+        self.transport.write(data)
+
+    async def write(
+        self, data: bytes, timeout: TimeoutConfig = None, flag: TimeoutFlag = None
+    ) -> None:
+        if not data:
             return
 
-        timeout = self.pool_limits.pool_timeout
+        if timeout is None:
+            timeout = self.timeout
+
+        protocol = self.protocol
+        if protocol.exc is not None:
+            raise protocol.exc
+        self.transport.write(data)
+        if protocol.writing_paused:
+            protocol.drain_waiter = asyncio.get_event_loop().create_future()
+            try:
+                with IOTimeout(timeout.write_timeout, flag, WriteTimeout):
+                    await protocol.drain_waiter
+            finally:
+                protocol.drain_waiter = None
+
+    def is_connection_dropped(self) -> bool:
+        return self.protocol.eof and not self.protocol.num_unread
+
+    async def close(self) -> None:
+        self.transport.close()
+
+
+class Task(BaseTask):
+    def __init__(self, task: asyncio.Task, backend: "AsyncioBackend") -> None:
+        self.task = task
+        self.backend = backend
+        self.loop = backend.loop
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+    def is_running(self) -> bool:
+        # `AsyncioBackend.run()` may swap in a new event loop, in which case
+        # any task left over on a previous loop will never be resumed.
+        return not self.task.done() and self.loop is self.backend.loop
+
+    async def join(self) -> None:
+        await asyncio.wait({self.task})
+
+
+class PoolSemaphore(BasePoolSemaphore):
+    """
+    A bounded semaphore for connection slots, with an explicit queue of waiters.
+
+    Slots are handed out to waiters strictly in order of priority, and then
+    in order of arrival. Pool timeouts are enforced with a single timer for
+    the whole queue, rather than wrapping every waiter in `asyncio.wait_for`.
+    """
+
+    def __init__(self, pool_limits: PoolLimits):
+        self.pool_limits = pool_limits
+        self.max_value = pool_limits.hard_limit
+        self.value = pool_limits.hard_limit
+        self.num_waiters = 0
+        self.waiters: typing.List[typing.Tuple[int, int, asyncio.Future]] = []
+        self.deadlines: typing.List[typing.Tuple[float, int, asyncio.Future]] = []
+        self.timer: typing.Optional[asyncio.TimerHandle] = None
+        self.counter = itertools.count()
+
+    async def acquire(self, priority: int = 0, timeout: float = None) -> None:
+        if self.value is None:
+            return
+
+        # Only take a slot straight away if nobody is already queued for one.
+        if self.value > 0 and not self.num_waiters:
+            self.value -= 1
+            return
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        count = next(self.counter)
+        heapq.heappush(self.waiters, (-priority, count, future))
+        self.num_waiters += 1
+
+        if timeout is None:
+            timeout = self.pool_limits.pool_timeout
+        if timeout is not None:
+            deadline = loop.time() + timeout
+            # The timer is always set for the earliest deadline in the heap,
+            # so we only need to move it if this deadline is due sooner.
+            if self.timer is None or deadline < self.deadlines[0][0]:
+                if self.timer is not None:
+                    self.timer.cancel()
+                self.timer = loop.call_at(deadline, self.expire_waiters, loop)
+            heapq.heappush(self.deadlines, (deadline, count, future))
+
         try:
-            await asyncio.wait_for(self.semaphore.acquire(), timeout)
-        except asyncio.TimeoutError:
-            raise PoolTimeout()
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self.num_waiters -= 1
+            elif future.exception() is None:
+                # We were handed a slot, but cancelled before we could use it.
+                self.release()
+            raise
 
     def release(self) -> None:
-        if self.semaphore is None:
+        if self.value is None or self.max_value is None:
             return
 
-        self.semaphore.release()
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                # Hand our slot directly over to the next waiter.
+                self.num_waiters -= 1
+                future.set_result(None)
+                return
+
+        if self.value >= self.max_value:
+            raise ValueError("PoolSemaphore released too many times.")
+        self.value += 1
+        self.deadlines.clear()
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def expire_waiters(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Raise `PoolTimeout` in any waiters that have passed their deadline, and
+        then reset the timer for the next deadline, if there is one.
+        """
+        self.timer = None
+        now = loop.time()
+        while self.deadlines:
+            deadline, _, future = self.deadlines[0]
+            if future.done():
+                heapq.heappop(self.deadlines)
+            elif deadline <= now:
+                heapq.heappop(self.deadlines)
+                self.num_waiters -= 1
+                future.set_exception(PoolTimeout())
+            else:
+                self.timer = loop.call_at(deadline, self.expire_waiters, loop)
+                break
+
+
+class Resolver(BaseResolver):
+    """
+    Resolves hostnames using `getaddrinfo()` in the default executor, with
+    an in-process cache.
+
+    * Successful lookups are cached for `ttl` seconds, and failed lookups
+      for `negative_ttl` seconds.
+    * Concurrent lookups of the same hostname share a single `getaddrinfo()`.
+    * `overrides` maps a hostname, or a "hostname:port" string, onto one or
+      more IP addresses to use instead of looking the hostname up, in the
+      same way as curl's `--resolve` option.
+    * If `rotate` is set, each lookup rotates the addresses of each address
+      family by one place, so that successive connections are spread across
+      all of a host's A and AAAA records.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        overrides: typing.Mapping[str, typing.Union[str, typing.Sequence[str]]] = None,
+        rotate: bool = True,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.overrides = {} if overrides is None else dict(overrides)
+        self.rotate = rotate
+        self.cache: typing.Dict[
+            typing.Tuple[str, int],
+            typing.Tuple[float, typing.Union[typing.List[AddressInfo], OSError]],
+        ] = {}
+        self.lookups: typing.Dict[typing.Tuple[str, int], asyncio.Future] = {}
+        self.rotations: typing.Dict[typing.Tuple[str, int], int] = {}
+
+    async def resolve(self, hostname: str, port: int) -> typing.List[AddressInfo]:
+        addresses = self.get_override(hostname, port)
+        if addresses is None:
+            addresses = await self.lookup(hostname, port)
+        if self.rotate:
+            addresses = self.rotate_addresses(hostname, port, addresses)
+        return addresses
+
+    def get_override(
+        self, hostname: str, port: int
+    ) -> typing.Optional[typing.List[AddressInfo]]:
+        hosts = self.overrides.get(f"{hostname}:{port}", self.overrides.get(hostname))
+        if hosts is None:
+            return None
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        # Overrides are always IP addresses, so this never blocks on DNS.
+        return [
+            address
+            for host in hosts
+            for address in socket.getaddrinfo(
+                host, port, type=socket.SOCK_STREAM, flags=socket.AI_NUMERICHOST
+            )
+        ]
+
+    async def lookup(self, hostname: str, port: int) -> typing.List[AddressInfo]:
+        loop = asyncio.get_event_loop()
+        key = (hostname, port)
+
+        cached = self.cache.get(key)
+        if cached is not None and loop.time() >= cached[0]:
+            del self.cache[key]
+            cached = None
+
+        if cached is not None:
+            result = cached[1]
+        else:
+            if key not in self.lookups:
+                self.lookups[key] = loop.create_task(self.getaddrinfo(key))
+            # Shield the shared lookup, so that one caller being cancelled
+            # doesn't cancel it for everyone else.
+            result = await asyncio.shield(self.lookups[key])
+
+        if isinstance(result, OSError):
+            raise result
+        return list(result)
+
+    async def getaddrinfo(
+        self, key: typing.Tuple[str, int]
+    ) -> typing.Union[typing.List[AddressInfo], OSError]:
+        loop = asyncio.get_event_loop()
+        hostname, port = key
+        result: typing.Union[typing.List[AddressInfo], OSError]
+        try:
+            addresses = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+            result = list(addresses)
+            ttl = self.ttl
+        except OSError as exc:
+            result = exc
+            ttl = self.negative_ttl
+        finally:
+            del self.lookups[key]
+
+        self.cache[key] = (loop.time() + ttl, result)
+        return result
+
+    def rotate_addresses(
+        self, hostname: str, port: int, addresses: typing.List[AddressInfo]
+    ) -> typing.List[AddressInfo]:
+        key = (hostname, port)
+        count = self.rotations.get(key, 0)
+        self.rotations[key] = count + 1
+
+        by_family: typing.Dict[int, typing.List[AddressInfo]] = {}
+        for address in addresses:
+            by_family.setdefault(address[0], []).append(address)
+
+        rotated = []
+        for group in by_family.values():
+            offset = count % len(group)
+            rotated.extend(group[offset:] + group[:offset])
+        return rotated
+
+
+class SessionSSLContext:
+    """
+    Wraps an `SSLContext` so that the TLS connections it creates attempt to
+    resume the given session, since `asyncio` has no way of passing the
+    session through to `SSLContext.wrap_bio()` itself.
+    """
+
+    def __init__(self, ssl_context: ssl.SSLContext, session: ssl.SSLSession) -> None:
+        self.ssl_context = ssl_context
+        self.session = session
+
+    def wrap_bio(
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: str = None,
+        session: ssl.SSLSession = None,
+    ) -> ssl.SSLObject:
+        return self.ssl_context.wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=self.session,
+        )
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self.ssl_context, name)
+
+
+def close_connected_socket(attempt: asyncio.Future) -> None:
+    """
+    Close the socket from a losing connection attempt, if it connected
+    before it could be cancelled.
+    """
+    if not attempt.cancelled() and attempt.exception() is None:
+        attempt.result().close()
 
 
 class AsyncioBackend(ConcurrencyBackend):
-    def __init__(self) -> None:
+    """
+    The asyncio concurrency backend.
+
+    Connections are made "Happy Eyeballs" style: connection attempts to each
+    resolved address are started `happy_eyeballs_delay` seconds apart, or as
+    soon as the previous attempt fails, and the first to succeed is used.
+    Setting `happy_eyeballs_delay` to `None` tries addresses one at a time.
+    `interleave` is the number of addresses of the first address family to
+    try, before alternating between address families.
+
+    Hostnames are looked up with `resolver`, which defaults to a caching
+    `Resolver`.
+
+    Setting `protocol_streams` uses streams built directly on
+    `asyncio.BufferedProtocol`, rather than on `asyncio.StreamReader` and
+    `asyncio.StreamWriter`. See `ProtocolStream`.
+    """
+
+    def __init__(
+        self,
+        happy_eyeballs_delay: typing.Optional[float] = HAPPY_EYEBALLS_DELAY,
+        interleave: int = 1,
+        resolver: BaseResolver = None,
+        protocol_streams: bool = False,
+    ) -> None:
         global SSL_MONKEY_PATCH_APPLIED
 
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+        self.interleave = interleave
+        self.resolver = Resolver() if resolver is None else resolver
+        self.protocol_streams = protocol_streams
+
         if not SSL_MONKEY_PATCH_APPLIED:
             ssl_monkey_patch()
         SSL_MONKEY_PATCH_APPLIED = True
@@ -181,19 +742,107 @@ class AsyncioBackend(ConcurrencyBackend):
         port: int,
         ssl_context: typing.Optional[ssl.SSLContext],
         timeout: TimeoutConfig,
+        ssl_session: ssl.SSLSession = None,
     ) -> BaseStream:
-        try:
-            stream_reader, stream_writer = await asyncio.wait_for(  # type: ignore
-                asyncio.open_connection(hostname, port, ssl=ssl_context),
-                timeout.connect_timeout,
+        if ssl_context is not None and ssl_session is not None:
+            ssl_context = typing.cast(
+                ssl.SSLContext, SessionSSLContext(ssl_context, ssl_session)
             )
-        except asyncio.TimeoutError:
-            raise ConnectTimeout()
 
+        with IOTimeout(timeout.connect_timeout, None, ConnectTimeout):
+            return await self.open_connection(hostname, port, ssl_context, timeout)
+
+    async def open_connection(
+        self,
+        hostname: str,
+        port: int,
+        ssl_context: typing.Optional[ssl.SSLContext],
+        timeout: TimeoutConfig,
+    ) -> BaseStream:
+        resolved = await self.resolver.resolve(hostname, port)
+        addresses = interleave_addresses(resolved, self.interleave)
+        sock = await self.connect_happy_eyeballs(addresses)
+        server_hostname = hostname if ssl_context is not None else None
+
+        if self.protocol_streams:
+            _, protocol = await self.loop.create_connection(
+                StreamProtocol,
+                sock=sock,
+                ssl=ssl_context,
+                server_hostname=server_hostname,
+            )
+            return ProtocolStream(protocol=protocol, timeout=timeout)
+
+        stream_reader, stream_writer = await asyncio.open_connection(
+            sock=sock, ssl=ssl_context, server_hostname=server_hostname
+        )
         return Stream(
             stream_reader=stream_reader, stream_writer=stream_writer, timeout=timeout
         )
 
+    async def connect_happy_eyeballs(
+        self, addresses: typing.List[AddressInfo]
+    ) -> socket.socket:
+        """
+        Race staggered connection attempts to each of the addresses, and
+        return the socket for the first attempt to succeed.
+        """
+        errors: typing.List[BaseException] = []
+        pending: typing.Set[asyncio.Future] = set()
+
+        def check(done: typing.Set[asyncio.Future]) -> typing.Optional[socket.socket]:
+            winner = None
+            for attempt in done:
+                exc = attempt.exception()
+                if exc is not None:
+                    errors.append(exc)
+                elif winner is None:
+                    winner = attempt.result()
+                else:
+                    attempt.result().close()
+            return winner
+
+        try:
+            for address in addresses:
+                pending.add(self.loop.create_task(self.connect_address(address)))
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.happy_eyeballs_delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                winner = check(done)
+                if winner is not None:
+                    return winner
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = check(done)
+                if winner is not None:
+                    return winner
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+                attempt.add_done_callback(close_connected_socket)
+
+        if len(errors) == 1:
+            raise errors[0]
+        raise OSError(
+            "Multiple exceptions: {}".format(", ".join(str(exc) for exc in errors))
+        )
+
+    async def connect_address(self, address: AddressInfo) -> socket.socket:
+        family, type_, proto, _, sockaddr = address
+        sock = socket.socket(family, type_, proto)
+        try:
+            sock.setblocking(False)
+            await self.loop.sock_connect(sock, sockaddr)
+        except BaseException as exc:
+            sock.close()
+            raise exc
+        return sock
+
     async def run_in_threadpool(
         self, func: typing.Callable, *args: typing.Any, **kwargs: typing.Any
     ) -> typing.Any:
@@ -222,6 +871,17 @@ class AsyncioBackend(ConcurrencyBackend):
     def create_event(self) -> BaseEvent:
         return typing.cast(BaseEvent, asyncio.Event())
 
+    def deadline(
+        self, timeout: typing.Optional[float], exc_class: typing.Type[Exception]
+    ) -> typing.ContextManager:
+        return IOTimeout(timeout, None, exc_class)
+
+    def create_task(self, coroutine: typing.Callable, *args: typing.Any) -> BaseTask:
+        return Task(self.loop.create_task(coroutine(*args)), backend=self)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
     def background_manager(
         self, coroutine: typing.Callable, *args: typing.Any
     ) -> "BackgroundManager":
@@ -21,6 +21,7 @@ class TimeoutFlag:
     def __init__(self) -> None:
         self.raise_on_read_timeout = False
         self.raise_on_write_timeout = True
+        self.listeners: typing.List[typing.Callable[[], None]] = []
 
     def set_read_timeouts(self) -> None:
         """
@@ -28,6 +29,7 @@ class TimeoutFlag:
         """
         self.raise_on_read_timeout = True
         self.raise_on_write_timeout = False
+        self.notify_listeners()
 
     def set_write_timeouts(self) -> None:
         """
@@ -35,6 +37,21 @@ class TimeoutFlag:
         """
         self.raise_on_read_timeout = False
         self.raise_on_write_timeout = True
+        self.notify_listeners()
+
+    def add_listener(self, listener: typing.Callable[[], None]) -> None:
+        """
+        Register a callback to be run whenever the flag switches modes, so
+        that pending reads or writes can arm or disarm their timeouts.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: typing.Callable[[], None]) -> None:
+        self.listeners.remove(listener)
+
+    def notify_listeners(self) -> None:
+        for listener in list(self.listeners):
+            listener()
 
 
 class BaseStream:
@@ -47,6 +64,16 @@ class BaseStream:
     def get_http_version(self) -> str:
         raise NotImplementedError()  # pragma: no cover
 
+    def get_ssl_session(self) -> typing.Optional[ssl.SSLSession]:
+        """
+        Return the TLS session, which may be used to resume it on another
+        connection, or `None` if this is not a TLS stream.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+    def is_ssl_session_reused(self) -> bool:
+        raise NotImplementedError()  # pragma: no cover
+
     async def read(
         self, n: int, timeout: TimeoutConfig = None, flag: typing.Any = None
     ) -> bytes:
@@ -92,14 +119,61 @@ class BaseEvent:
         raise NotImplementedError()  # pragma: no cover
 
 
+class BaseTask:
+    """
+    A handle onto a task running in the background.
+
+    Abstracts away any asyncio-specific interfaces.
+    """
+
+    def cancel(self) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    def is_running(self) -> bool:
+        """
+        Return `True` if the task has not yet finished, and belongs to the
+        event loop that the backend is currently using.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+    async def join(self) -> None:
+        """
+        Wait for the task to finish, without raising if it was cancelled.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+
+class BaseResolver:
+    """
+    Resolves hostnames into the addresses to connect to, in the same format
+    as `socket.getaddrinfo()`.
+
+    Abstracts away any asyncio-specific interfaces.
+    """
+
+    async def resolve(
+        self, hostname: str, port: int
+    ) -> typing.List[typing.Tuple[int, int, int, str, typing.Any]]:
+        raise NotImplementedError()  # pragma: no cover
+
+
 class BasePoolSemaphore:
     """
     A semaphore for use with connection pooling.
 
     Abstracts away any asyncio-specific interfaces.
+
+    Waiters with a higher `priority` should be granted a slot first, and
+    waiters with the same `priority` in the order that they arrived.
+
+    If a `timeout` is given to `acquire()` it is used in place of the
+    pool timeout, so that callers can carry a single deadline across
+    several semaphores.
     """
 
-    async def acquire(self) -> None:
+    num_waiters = 0
+
+    async def acquire(self, priority: int = 0, timeout: float = None) -> None:
         raise NotImplementedError()  # pragma: no cover
 
     def release(self) -> None:
@@ -113,6 +187,7 @@ class ConcurrencyBackend:
         port: int,
         ssl_context: typing.Optional[ssl.SSLContext],
         timeout: TimeoutConfig,
+        ssl_session: ssl.SSLSession = None,
     ) -> BaseStream:
         raise NotImplementedError()  # pragma: no cover
 
@@ -158,6 +233,21 @@ class ConcurrencyBackend:
     def create_event(self) -> BaseEvent:
         raise NotImplementedError()  # pragma: no cover
 
+    def deadline(
+        self, timeout: typing.Optional[float], exc_class: typing.Type[Exception]
+    ) -> typing.ContextManager:
+        """
+        Return a context manager that raises `exc_class` if the block within
+        it has not completed after `timeout` seconds.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+    def create_task(self, coroutine: typing.Callable, *args: typing.Any) -> BaseTask:
+        raise NotImplementedError()  # pragma: no cover
+
+    async def sleep(self, seconds: float) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
     def background_manager(
         self, coroutine: typing.Callable, *args: typing.Any
     ) -> "BaseBackgroundManager":
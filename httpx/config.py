@@ -1,4 +1,5 @@
 import ssl
+import threading
 import typing
 from pathlib import Path
 
@@ -38,6 +39,16 @@ DEFAULT_CIPHERS = ":".join(
 )
 
 
+SSLContextKey = typing.Tuple[
+    typing.Union[str, bool], typing.Optional[CertTypes], typing.Tuple[str, ...]
+]
+
+# Building an SSL context means parsing the whole CA bundle, so we share
+# contexts across the process, keyed by (verify, cert, ALPN protocols).
+SSL_CONTEXT_CACHE: typing.Dict[SSLContextKey, ssl.SSLContext] = {}
+SSL_CONTEXT_CACHE_LOCK = threading.Lock()
+
+
 class SSLConfig:
     """
     SSL Configuration.
@@ -83,15 +94,37 @@ class SSLConfig:
         http_versions = HTTPVersionConfig() if http_versions is None else http_versions
 
         if self.ssl_context is None:
-            self.ssl_context = (
-                self.load_ssl_context_verify(http_versions=http_versions)
-                if self.verify
-                else self.load_ssl_context_no_verify(http_versions=http_versions)
-            )
+            key = self._cache_key(http_versions)
+            with SSL_CONTEXT_CACHE_LOCK:
+                if key not in SSL_CONTEXT_CACHE:
+                    SSL_CONTEXT_CACHE[key] = (
+                        self.load_ssl_context_verify(http_versions=http_versions)
+                        if self.verify
+                        else self.load_ssl_context_no_verify(
+                            http_versions=http_versions
+                        )
+                    )
+                self.ssl_context = SSL_CONTEXT_CACHE[key]
 
         assert self.ssl_context is not None
         return self.ssl_context
 
+    def get_cached_ssl_context(
+        self, http_versions: "HTTPVersionConfig" = None
+    ) -> typing.Optional[ssl.SSLContext]:
+        """
+        Return the SSL context if it has already been loaded, without doing
+        any blocking work, or `None` otherwise.
+        """
+        http_versions = HTTPVersionConfig() if http_versions is None else http_versions
+
+        if self.ssl_context is None:
+            self.ssl_context = SSL_CONTEXT_CACHE.get(self._cache_key(http_versions))
+        return self.ssl_context
+
+    def _cache_key(self, http_versions: "HTTPVersionConfig") -> SSLContextKey:
+        return (self.verify, self.cert, tuple(http_versions.alpn_identifiers))
+
     def load_ssl_context_no_verify(
         self, http_versions: "HTTPVersionConfig"
     ) -> ssl.SSLContext:
@@ -197,7 +230,11 @@ class TimeoutConfig:
         connect_timeout: float = None,
         read_timeout: float = None,
         write_timeout: float = None,
+        total_timeout: float = None,
     ):
+        # The total timeout is a deadline for the request as a whole,
+        # spanning connecting, sending, receiving, and any redirects.
+        self.total_timeout = total_timeout
         if timeout is None:
             self.connect_timeout = connect_timeout
             self.read_timeout = read_timeout
@@ -208,9 +245,11 @@ class TimeoutConfig:
             assert read_timeout is None
             assert write_timeout is None
             if isinstance(timeout, TimeoutConfig):
+                assert total_timeout is None
                 self.connect_timeout = timeout.connect_timeout
                 self.read_timeout = timeout.read_timeout
                 self.write_timeout = timeout.write_timeout
+                self.total_timeout = timeout.total_timeout
             elif isinstance(timeout, tuple):
                 self.connect_timeout = timeout[0]
                 self.read_timeout = timeout[1]
@@ -226,10 +265,18 @@ class TimeoutConfig:
             and self.connect_timeout == other.connect_timeout
             and self.read_timeout == other.read_timeout
             and self.write_timeout == other.write_timeout
+            and self.total_timeout == other.total_timeout
         )
 
     def __repr__(self) -> str:
         class_name = self.__class__.__name__
+        if self.total_timeout is not None:
+            return (
+                f"{class_name}(connect_timeout={self.connect_timeout}, "
+                f"read_timeout={self.read_timeout}, "
+                f"write_timeout={self.write_timeout}, "
+                f"total_timeout={self.total_timeout})"
+            )
         if len({self.connect_timeout, self.read_timeout, self.write_timeout}) == 1:
             return f"{class_name}(timeout={self.connect_timeout})"
         return (
@@ -295,10 +342,16 @@ class PoolLimits:
         soft_limit: int = None,
         hard_limit: int = None,
         pool_timeout: float = None,
+        keepalive_expiry: float = None,
+        soft_limit_per_origin: int = None,
+        hard_limit_per_origin: int = None,
     ):
         self.soft_limit = soft_limit
         self.hard_limit = hard_limit
         self.pool_timeout = pool_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self.soft_limit_per_origin = soft_limit_per_origin
+        self.hard_limit_per_origin = hard_limit_per_origin
 
     def __eq__(self, other: typing.Any) -> bool:
         return (
@@ -306,13 +359,19 @@ class PoolLimits:
             and self.soft_limit == other.soft_limit
             and self.hard_limit == other.hard_limit
             and self.pool_timeout == other.pool_timeout
+            and self.keepalive_expiry == other.keepalive_expiry
+            and self.soft_limit_per_origin == other.soft_limit_per_origin
+            and self.hard_limit_per_origin == other.hard_limit_per_origin
         )
 
     def __repr__(self) -> str:
         class_name = self.__class__.__name__
         return (
             f"{class_name}(soft_limit={self.soft_limit}, "
-            f"hard_limit={self.hard_limit}, pool_timeout={self.pool_timeout})"
+            f"hard_limit={self.hard_limit}, pool_timeout={self.pool_timeout}, "
+            f"keepalive_expiry={self.keepalive_expiry}, "
+            f"soft_limit_per_origin={self.soft_limit_per_origin}, "
+            f"hard_limit_per_origin={self.hard_limit_per_origin})"
         )
 
 
@@ -48,6 +48,12 @@ class AsyncDispatcher:
     ) -> AsyncResponse:
         raise NotImplementedError()  # pragma: nocover
 
+    async def preconnect(self, url: URLTypes, count: int = 1) -> None:
+        """
+        Open connections to the given URL ahead of time. Dispatchers that
+        don't hold on to any connections have nothing to do here.
+        """
+
     async def close(self) -> None:
         pass  # pragma: nocover
 
@@ -4,7 +4,7 @@ import typing
 
 from .base import AsyncDispatcher
 from ..concurrency.asyncio import AsyncioBackend
-from ..concurrency.base import ConcurrencyBackend
+from ..concurrency.base import BaseStream, ConcurrencyBackend
 from ..config import (
     DEFAULT_TIMEOUT_CONFIG,
     CertTypes,
@@ -23,6 +23,47 @@ from .http11 import HTTP11Connection
 ReleaseCallback = typing.Callable[["HTTPConnection"], typing.Awaitable[None]]
 
 
+class SSLSessionCache:
+    """
+    Holds on to the most recent TLS session for each origin, so that new
+    connections can resume it rather than making a full TLS handshake.
+
+    Sessions can only be resumed with the SSL context that created them,
+    so we store the context alongside each session.
+    """
+
+    def __init__(self) -> None:
+        self.sessions: typing.Dict[
+            Origin, typing.Tuple[ssl.SSLContext, ssl.SSLSession]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, origin: Origin, ssl_context: ssl.SSLContext
+    ) -> typing.Optional[ssl.SSLSession]:
+        try:
+            session_context, session = self.sessions[origin]
+        except KeyError:
+            return None
+        return session if session_context is ssl_context else None
+
+    def save(
+        self,
+        origin: Origin,
+        ssl_context: ssl.SSLContext,
+        session: typing.Optional[ssl.SSLSession],
+    ) -> None:
+        if session is not None:
+            self.sessions[origin] = (ssl_context, session)
+
+    def record_handshake(self, reused: bool) -> None:
+        if reused:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+
 class HTTPConnection(AsyncDispatcher):
     def __init__(
         self,
@@ -33,6 +74,9 @@ class HTTPConnection(AsyncDispatcher):
         http_versions: HTTPVersionTypes = None,
         backend: ConcurrencyBackend = None,
         release_func: typing.Optional[ReleaseCallback] = None,
+        ssl_sessions: SSLSessionCache = None,
+        http11_parser: str = "h11",
+        pipeline_depth: int = 1,
     ):
         self.origin = Origin(origin) if isinstance(origin, str) else origin
         self.ssl = SSLConfig(cert=cert, verify=verify)
@@ -40,6 +84,11 @@ class HTTPConnection(AsyncDispatcher):
         self.http_versions = HTTPVersionConfig(http_versions)
         self.backend = AsyncioBackend() if backend is None else backend
         self.release_func = release_func
+        self.ssl_sessions = ssl_sessions
+        self.http11_parser = http11_parser
+        self.pipeline_depth = pipeline_depth
+        self.ssl_context: typing.Optional[ssl.SSLContext] = None
+        self.stream: typing.Optional[BaseStream] = None
         self.h11_connection = None  # type: typing.Optional[HTTP11Connection]
         self.h2_connection = None  # type: typing.Optional[HTTP2Connection]
 
@@ -59,6 +108,7 @@ class HTTPConnection(AsyncDispatcher):
             assert self.h11_connection is not None
             response = await self.h11_connection.send(request, timeout=timeout)
 
+        self.save_ssl_session()
         return response
 
     async def connect(
@@ -79,7 +129,17 @@ class HTTPConnection(AsyncDispatcher):
         else:
             on_release = functools.partial(self.release_func, self)
 
-        stream = await self.backend.connect(host, port, ssl_context, timeout)
+        ssl_session = None
+        if ssl_context is not None and self.ssl_sessions is not None:
+            ssl_session = self.ssl_sessions.get(self.origin, ssl_context)
+
+        stream = await self.backend.connect(
+            host, port, ssl_context, timeout, ssl_session=ssl_session
+        )
+        if ssl_context is not None and self.ssl_sessions is not None:
+            self.ssl_sessions.record_handshake(stream.is_ssl_session_reused())
+        self.ssl_context = ssl_context
+        self.stream = stream
         http_version = stream.get_http_version()
 
         if http_version == "HTTP/2":
@@ -89,13 +149,21 @@ class HTTPConnection(AsyncDispatcher):
         else:
             assert http_version == "HTTP/1.1"
             self.h11_connection = HTTP11Connection(
-                stream, self.backend, on_release=on_release
+                stream,
+                self.backend,
+                on_release=on_release,
+                http11_parser=self.http11_parser,
+                pipeline_depth=self.pipeline_depth,
             )
 
     async def get_ssl_context(self, ssl: SSLConfig) -> typing.Optional[ssl.SSLContext]:
         if not self.origin.is_ssl:
             return None
 
+        ssl_context = ssl.get_cached_ssl_context(self.http_versions)
+        if ssl_context is not None:
+            return ssl_context
+
         # Run the SSL loading in a threadpool, since it may make disk accesses.
         return await self.backend.run_in_threadpool(
             ssl.load_ssl_context, self.http_versions
@@ -107,10 +175,63 @@ class HTTPConnection(AsyncDispatcher):
         elif self.h11_connection is not None:
             await self.h11_connection.close()
 
+    def save_ssl_session(self) -> None:
+        """
+        Save our TLS session so that later connections to the same origin can
+        resume it. We do this once we've received a response, since TLS 1.3
+        servers only send session tickets after the handshake has completed,
+        and before the connection may have been closed.
+        """
+        if self.ssl_sessions is not None and self.ssl_context is not None:
+            assert self.stream is not None
+            session = self.stream.get_ssl_session()
+            self.ssl_sessions.save(self.origin, self.ssl_context, session)
+
     @property
     def is_http2(self) -> bool:
         return self.h2_connection is not None
 
+    @property
+    def num_open_streams(self) -> int:
+        """
+        The number of requests in flight on an HTTP/2 connection.
+        """
+        return 0 if self.h2_connection is None else self.h2_connection.num_open_streams
+
+    def can_open_stream(self) -> bool:
+        """
+        Return `True` if this is an HTTP/2 connection that can accept another
+        request without exceeding the server's concurrent stream limit.
+        """
+        return self.h2_connection is not None and self.h2_connection.can_open_stream()
+
+    @property
+    def num_pipelined_requests(self) -> int:
+        """
+        The number of pipelined requests in flight on an HTTP/1.1 connection.
+        """
+        if self.h11_connection is None:
+            return 0
+        return len(self.h11_connection.pipeline)
+
+    def can_pipeline(self) -> bool:
+        """
+        Return `True` if this is an HTTP/1.1 connection that another request
+        may be pipelined onto.
+        """
+        return self.h11_connection is not None and self.h11_connection.can_pipeline()
+
+    @property
+    def http_version(self) -> typing.Optional[str]:
+        """
+        The negotiated HTTP version, or `None` if we have not yet connected.
+        """
+        if self.h2_connection is not None:
+            return "HTTP/2"
+        elif self.h11_connection is not None:
+            return "HTTP/1.1"
+        return None
+
     @property
     def is_closed(self) -> bool:
         if self.h2_connection is not None:
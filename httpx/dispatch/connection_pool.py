@@ -1,22 +1,55 @@
+import time
 import typing
 
 from .base import AsyncDispatcher
 from ..concurrency.asyncio import AsyncioBackend
-from ..concurrency.base import ConcurrencyBackend
+from ..concurrency.base import (
+    BaseEvent,
+    BasePoolSemaphore,
+    BaseTask,
+    ConcurrencyBackend,
+)
 from ..config import (
     DEFAULT_POOL_LIMITS,
     DEFAULT_TIMEOUT_CONFIG,
     CertTypes,
+    HTTPVersionConfig,
     HTTPVersionTypes,
     PoolLimits,
     TimeoutTypes,
     VerifyTypes,
 )
-from ..models import AsyncRequest, AsyncResponse, Origin
-from .connection import HTTPConnection
+from ..models import URL, AsyncRequest, AsyncResponse, Origin, URLTypes
+from .connection import HTTPConnection, SSLSessionCache
+from .http11 import PipelineAborted, is_pipelinable
 
 CONNECTIONS_DICT = typing.Dict[Origin, typing.List[HTTPConnection]]
 
+POOL_WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class Histogram:
+    """
+    Counts observed values into a fixed set of buckets, each identified by
+    its upper bound.
+    """
+
+    def __init__(self, buckets: typing.Sequence[float]) -> None:
+        self.buckets = {bound: 0 for bound in buckets}
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for bound in self.buckets:
+            if value <= bound:
+                self.buckets[bound] += 1
+                break
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        return {"count": self.count, "sum": self.sum, "buckets": dict(self.buckets)}
+
 
 class ConnectionStore:
     """
@@ -25,24 +58,22 @@ class ConnectionStore:
     * Lookup connections by origin.
     * Iterate over connections by insertion time.
     * Return the total number of connections.
+    * Find connections that have been in the store for longer than some expiry.
+
+    Each connection is stored along with the time at which it was added.
     """
 
     def __init__(self) -> None:
         self.all: typing.Dict[HTTPConnection, float] = {}
         self.by_origin: typing.Dict[Origin, typing.Dict[HTTPConnection, float]] = {}
 
-    def pop_by_origin(
-        self, origin: Origin, http2_only: bool = False
-    ) -> typing.Optional[HTTPConnection]:
+    def pop_by_origin(self, origin: Origin) -> typing.Optional[HTTPConnection]:
         try:
             connections = self.by_origin[origin]
         except KeyError:
             return None
 
         connection = next(reversed(list(connections.keys())))
-        if http2_only and not connection.is_http2:
-            return None
-
         del connections[connection]
         if not connections:
             del self.by_origin[origin]
@@ -50,12 +81,77 @@ class ConnectionStore:
 
         return connection
 
+    def get_http2_connection(self, origin: Origin) -> typing.Optional[HTTPConnection]:
+        """
+        Return the least loaded HTTP/2 connection to the origin that can
+        accept another stream, if there is one. The connection is left in
+        the store, since it may be shared by several requests.
+        """
+        connections = [
+            connection
+            for connection in self.by_origin.get(origin, {})
+            if connection.can_open_stream()
+        ]
+        return min(
+            connections,
+            key=lambda connection: connection.num_open_streams,
+            default=None,
+        )
+
+    def get_pipelined_connection(
+        self, origin: Origin
+    ) -> typing.Optional[HTTPConnection]:
+        """
+        Return the least loaded HTTP/1.1 connection to the origin that
+        another request may be pipelined onto, if there is one.
+        """
+        connections = [
+            connection
+            for connection in self.by_origin.get(origin, {})
+            if connection.can_pipeline()
+        ]
+        return min(
+            connections,
+            key=lambda connection: connection.num_pipelined_requests,
+            default=None,
+        )
+
+    def pop_expired(self, expiry: float) -> typing.List[HTTPConnection]:
+        """
+        Remove and return any connections that were added more than
+        `expiry` seconds ago.
+        """
+        cutoff = time.monotonic() - expiry
+        expired = []
+        for connection, added_at in self.all.items():
+            if added_at > cutoff:
+                # Connections are ordered by insertion time, so there's no
+                # need to look any further.
+                break
+            expired.append(connection)
+
+        for connection in expired:
+            self.remove(connection)
+        return expired
+
+    def time_until_expiry(self, expiry: float) -> float:
+        """
+        Return the number of seconds until the oldest connection in the
+        store has been here for longer than `expiry` seconds.
+        """
+        added_at = next(iter(self.all.values()))
+        return max(added_at + expiry - time.monotonic(), 0.0)
+
+    def count_by_origin(self, origin: Origin) -> int:
+        return len(self.by_origin.get(origin, {}))
+
     def add(self, connection: HTTPConnection) -> None:
-        self.all[connection] = 0.0
+        added_at = time.monotonic()
+        self.all[connection] = added_at
         try:
-            self.by_origin[connection.origin][connection] = 0.0
+            self.by_origin[connection.origin][connection] = added_at
         except KeyError:
-            self.by_origin[connection.origin] = {connection: 0.0}
+            self.by_origin[connection.origin] = {connection: added_at}
 
     def remove(self, connection: HTTPConnection) -> None:
         del self.all[connection]
@@ -70,6 +166,9 @@ class ConnectionStore:
     def __iter__(self) -> typing.Iterator[HTTPConnection]:
         return iter(self.all.keys())
 
+    def __contains__(self, connection: typing.Any) -> bool:
+        return connection in self.all
+
     def __len__(self) -> int:
         return len(self.all)
 
@@ -84,12 +183,19 @@ class ConnectionPool(AsyncDispatcher):
         pool_limits: PoolLimits = DEFAULT_POOL_LIMITS,
         http_versions: HTTPVersionTypes = None,
         backend: ConcurrencyBackend = None,
+        http11_parser: str = "h11",
+        pipeline_depth: int = 1,
     ):
+        if pipeline_depth > 1 and http11_parser != "h11":
+            raise ValueError("HTTP/1.1 pipelining requires the 'h11' parser")
+
         self.verify = verify
         self.cert = cert
         self.timeout = timeout
         self.pool_limits = pool_limits
         self.http_versions = http_versions
+        self.http11_parser = http11_parser
+        self.pipeline_depth = pipeline_depth
         self.is_closed = False
 
         self.keepalive_connections = ConnectionStore()
@@ -97,6 +203,24 @@ class ConnectionPool(AsyncDispatcher):
 
         self.backend = AsyncioBackend() if backend is None else backend
         self.max_connections = self.backend.get_semaphore(pool_limits)
+        self.max_origin_connections: typing.Dict[Origin, BasePoolSemaphore] = {}
+        self.max_origin_connections_users: typing.Dict[Origin, int] = {}
+        self.keepalive_reaper: typing.Optional[BaseTask] = None
+        self.ssl_sessions = SSLSessionCache()
+        self.origin_http_versions: typing.Dict[Origin, str] = {}
+        self.pending_connections: typing.Dict[Origin, BaseEvent] = {}
+
+        self.counters = {
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connections_dropped": 0,
+            "connections_expired": 0,
+            "connections_closed_over_soft_limit": 0,
+            "connections_evicted": 0,
+            "requests_replayed": 0,
+        }
+        self.pool_wait_time = Histogram(POOL_WAIT_TIME_BUCKETS)
+        self.waiters_by_origin: typing.Dict[Origin, int] = {}
 
     @property
     def num_connections(self) -> int:
@@ -108,30 +232,98 @@ class ConnectionPool(AsyncDispatcher):
         verify: VerifyTypes = None,
         cert: CertTypes = None,
         timeout: TimeoutTypes = None,
+        priority: int = 0,
     ) -> AsyncResponse:
-        connection = await self.acquire_connection(origin=request.url.origin)
-        try:
-            response = await connection.send(
-                request, verify=verify, cert=cert, timeout=timeout
+        pipeline = self.pipeline_depth > 1 and is_pipelinable(request)
+        while True:
+            connection = await self.acquire_connection(
+                origin=request.url.origin,
+                priority=priority,
+                verify=verify,
+                cert=cert,
+                timeout=timeout,
+                pipeline=pipeline,
             )
-        except BaseException as exc:
-            self.active_connections.remove(connection)
-            self.max_connections.release()
-            raise exc
+            try:
+                response = await connection.send(
+                    request, verify=verify, cert=cert, timeout=timeout
+                )
+            except PipelineAborted:
+                # The connection failed before this request was answered.
+                self.remove_active_connection(connection)
+                self.counters["requests_replayed"] += 1
+                continue
+            except BaseException as exc:
+                self.remove_active_connection(connection)
+                raise exc
+            break
 
+        self.record_http_version(connection)
         return response
 
-    async def acquire_connection(self, origin: Origin) -> HTTPConnection:
-        connection = self.active_connections.pop_by_origin(origin, http2_only=True)
-        if connection is None:
-            connection = self.keepalive_connections.pop_by_origin(origin)
+    async def acquire_connection(
+        self,
+        origin: Origin,
+        priority: int = 0,
+        verify: VerifyTypes = None,
+        cert: CertTypes = None,
+        timeout: TimeoutTypes = None,
+        pipeline: bool = False,
+    ) -> HTTPConnection:
+        started = time.monotonic()
+        try:
+            return await self._acquire_connection(
+                origin=origin,
+                priority=priority,
+                verify=verify,
+                cert=cert,
+                timeout=timeout,
+                pipeline=pipeline,
+            )
+        finally:
+            # Record the wait whether or not we succeeded, so that waits
+            # ending in a `PoolTimeout` are included.
+            self.pool_wait_time.observe(time.monotonic() - started)
+
+    async def _acquire_connection(
+        self,
+        origin: Origin,
+        priority: int = 0,
+        verify: VerifyTypes = None,
+        cert: CertTypes = None,
+        timeout: TimeoutTypes = None,
+        pipeline: bool = False,
+    ) -> HTTPConnection:
+        await self.close_expired_connections()
+
+        while True:
+            connection = self.active_connections.get_http2_connection(origin)
+            if connection is None and pipeline:
+                connection = self.active_connections.get_pipelined_connection(origin)
+            if connection is not None:
+                self.counters["connections_reused"] += 1
+                return connection
+
+            # If another request is already connecting to an origin that
+            # may speak HTTP/2, or for pipelined requests, then wait to see
+            # if we can share it.
+            pending = self.pending_connections.get(origin)
+            if pending is None:
+                break
+            await pending.wait()
+
+        connection = self.keepalive_connections.pop_by_origin(origin)
 
-        if connection is not None and connection.is_connection_dropped():
-            self.max_connections.release()
-            connection = None
+        if connection is not None:
+            if connection.is_connection_dropped():
+                self.counters["connections_dropped"] += 1
+                self.release_slot(origin=origin)
+                connection = None
+            else:
+                self.counters["connections_reused"] += 1
 
         if connection is None:
-            await self.max_connections.acquire()
+            await self.acquire_slot(origin=origin, priority=priority)
             connection = HTTPConnection(
                 origin,
                 verify=self.verify,
@@ -140,29 +332,329 @@ class ConnectionPool(AsyncDispatcher):
                 http_versions=self.http_versions,
                 backend=self.backend,
                 release_func=self.release_connection,
+                ssl_sessions=self.ssl_sessions,
+                http11_parser=self.http11_parser,
+                pipeline_depth=self.pipeline_depth,
             )
+            self.counters["connections_created"] += 1
+            if pipeline or self.may_be_http2(origin):
+                await self.connect_single_flight(connection, verify, cert, timeout)
 
         self.active_connections.add(connection)
 
         return connection
 
+    def may_be_http2(self, origin: Origin) -> bool:
+        """
+        Return `True` if connections to the origin may negotiate HTTP/2,
+        either because they have done so before, or because we have not yet
+        connected to the origin.
+        """
+        if not origin.is_ssl:
+            return False
+        if "HTTP/2" not in HTTPVersionConfig(self.http_versions).http_versions:
+            return False
+        return self.origin_http_versions.get(origin, "HTTP/2") == "HTTP/2"
+
+    async def connect_single_flight(
+        self,
+        connection: HTTPConnection,
+        verify: VerifyTypes = None,
+        cert: CertTypes = None,
+        timeout: TimeoutTypes = None,
+    ) -> None:
+        """
+        Connect straight away, rather than when the request is sent, so that
+        any other requests to the origin can wait for this connection and
+        then share it if it turns out to be HTTP/2, or pipeline onto it.
+        """
+        origin = connection.origin
+        pending = self.backend.create_event()
+        self.pending_connections[origin] = pending
+        try:
+            await connection.connect(verify=verify, cert=cert, timeout=timeout)
+        except BaseException as exc:
+            self.release_slot(origin=origin)
+            raise exc
+        finally:
+            del self.pending_connections[origin]
+            pending.set()
+        self.record_http_version(connection)
+
+    def record_http_version(self, connection: HTTPConnection) -> None:
+        if connection.http_version is not None:
+            self.origin_http_versions[connection.origin] = connection.http_version
+
+    async def preconnect(self, url: URLTypes, count: int = 1) -> None:
+        """
+        Open `count` new connections to the origin of the given URL in
+        parallel, and keep them in the pool ready to be used by requests.
+
+        Raises the first error that any of the connections failed with, once
+        all of them have either connected or failed.
+        """
+        origin = URL(url).origin
+        errors: typing.List[Exception] = []
+        tasks = [
+            self.backend.create_task(self.open_idle_connection, origin, errors)
+            for _ in range(count)
+        ]
+        try:
+            for task in tasks:
+                await task.join()
+        except BaseException as exc:
+            for task in tasks:
+                task.cancel()
+            raise exc
+
+        if errors:
+            raise errors[0]
+
+    async def open_idle_connection(
+        self, origin: Origin, errors: typing.List[Exception]
+    ) -> None:
+        try:
+            await self.acquire_slot(origin=origin)
+            connection = HTTPConnection(
+                origin,
+                verify=self.verify,
+                cert=self.cert,
+                timeout=self.timeout,
+                http_versions=self.http_versions,
+                backend=self.backend,
+                release_func=self.release_connection,
+                ssl_sessions=self.ssl_sessions,
+                http11_parser=self.http11_parser,
+                pipeline_depth=self.pipeline_depth,
+            )
+            try:
+                await connection.connect()
+            except BaseException as exc:
+                self.release_slot(origin=origin)
+                raise exc
+        except Exception as exc:
+            errors.append(exc)
+            return
+
+        self.counters["connections_created"] += 1
+        self.keepalive_connections.add(connection)
+        self.start_keepalive_reaper()
+
+    async def acquire_slot(self, origin: Origin, priority: int = 0) -> None:
+        """
+        Wait until we're allowed to open a new connection to the given origin.
+
+        Requests first queue up behind any other requests to the same origin,
+        if there is a per-origin limit, and only then take a slot from the
+        pool as a whole. This ensures that a single slow origin cannot use up
+        the entire pool, and starve requests to any other origins.
+
+        Requests with a higher `priority` are granted a slot ahead of any
+        other waiting requests.
+        """
+        self.waiters_by_origin[origin] = self.waiters_by_origin.get(origin, 0) + 1
+        try:
+            await self._acquire_slot(origin=origin, priority=priority)
+        finally:
+            self.waiters_by_origin[origin] -= 1
+            if not self.waiters_by_origin[origin]:
+                del self.waiters_by_origin[origin]
+
+    async def _acquire_slot(self, origin: Origin, priority: int = 0) -> None:
+        if self.pool_limits.hard_limit_per_origin is None:
+            await self.evict_idle_connection(origin=origin)
+            await self.max_connections.acquire(priority=priority)
+            return
+
+        if origin not in self.max_origin_connections:
+            limits = PoolLimits(
+                hard_limit=self.pool_limits.hard_limit_per_origin,
+                pool_timeout=self.pool_limits.pool_timeout,
+            )
+            self.max_origin_connections[origin] = self.backend.get_semaphore(limits)
+            self.max_origin_connections_users[origin] = 0
+        self.max_origin_connections_users[origin] += 1
+
+        pool_timeout = self.pool_limits.pool_timeout
+        started = time.monotonic()
+        try:
+            await self.max_origin_connections[origin].acquire(priority=priority)
+        except BaseException as exc:
+            self.remove_origin_semaphore_user(origin)
+            raise exc
+
+        # The pool timeout applies to the wait as a whole, so we only allow
+        # whatever time is left over for the second semaphore.
+        if pool_timeout is not None:
+            pool_timeout = max(pool_timeout - (time.monotonic() - started), 0.0)
+        try:
+            await self.evict_idle_connection(origin=origin)
+            await self.max_connections.acquire(priority=priority, timeout=pool_timeout)
+        except BaseException as exc:
+            self.max_origin_connections[origin].release()
+            self.remove_origin_semaphore_user(origin)
+            raise exc
+
+    async def evict_idle_connection(self, origin: Origin) -> None:
+        """
+        If the pool is at its hard limit, close the least recently used
+        keep-alive connection to some other origin, so that we don't end up
+        waiting on a slot that is only held by an idle connection.
+        """
+        hard_limit = self.pool_limits.hard_limit
+        if hard_limit is None or self.num_connections < hard_limit:
+            return
+
+        for connection in self.keepalive_connections:
+            if connection.origin != origin:
+                break
+        else:
+            return
+
+        self.counters["connections_evicted"] += 1
+        self.keepalive_connections.remove(connection)
+        self.release_slot(origin=connection.origin)
+        await connection.close()
+
+    def release_slot(self, origin: Origin) -> None:
+        """
+        Release a connection slot, once a connection has been closed.
+        """
+        self.max_connections.release()
+        if self.pool_limits.hard_limit_per_origin is not None:
+            self.max_origin_connections[origin].release()
+            self.remove_origin_semaphore_user(origin)
+
+    def remove_origin_semaphore_user(self, origin: Origin) -> None:
+        """
+        Drop our per-origin semaphore once there are no longer any connections
+        to the origin, and no requests waiting on it.
+        """
+        self.max_origin_connections_users[origin] -= 1
+        if not self.max_origin_connections_users[origin]:
+            del self.max_origin_connections_users[origin]
+            del self.max_origin_connections[origin]
+
+    def remove_active_connection(self, connection: HTTPConnection) -> None:
+        """
+        Remove a failed or closed connection from the pool, and release its
+        slot. A connection shared by several requests may fail all of them,
+        so this is a no-op if the connection has already been removed.
+        """
+        if connection in self.active_connections:
+            self.active_connections.remove(connection)
+            self.release_slot(origin=connection.origin)
+
     async def release_connection(self, connection: HTTPConnection) -> None:
+        soft_limit_per_origin = self.pool_limits.soft_limit_per_origin
+
         if connection.is_closed:
-            self.active_connections.remove(connection)
-            self.max_connections.release()
+            self.remove_active_connection(connection)
         elif (
             self.pool_limits.soft_limit is not None
             and self.num_connections > self.pool_limits.soft_limit
+        ) or (
+            soft_limit_per_origin is not None
+            and self.keepalive_connections.count_by_origin(connection.origin)
+            >= soft_limit_per_origin
         ):
+            self.counters["connections_closed_over_soft_limit"] += 1
             self.active_connections.remove(connection)
-            self.max_connections.release()
+            self.release_slot(origin=connection.origin)
+            await connection.close()
+        elif self.max_connections.num_waiters:
+            # Other requests are waiting for a slot, so hand this one over
+            # rather than holding onto it with an idle connection.
+            self.counters["connections_evicted"] += 1
+            self.active_connections.remove(connection)
+            self.release_slot(origin=connection.origin)
             await connection.close()
         else:
             self.active_connections.remove(connection)
             self.keepalive_connections.add(connection)
+            self.start_keepalive_reaper()
+
+    def start_keepalive_reaper(self) -> None:
+        """
+        Start the background task that closes expired keep-alive connections,
+        if we have a keep-alive expiry and it is not already running.
+        """
+        if self.pool_limits.keepalive_expiry is None:
+            return
+        if self.keepalive_reaper is None or not self.keepalive_reaper.is_running():
+            self.keepalive_reaper = self.backend.create_task(self.reap_connections)
+
+    async def reap_connections(self) -> None:
+        """
+        Close idle keep-alive connections as they expire, for as long as there
+        are any keep-alive connections left in the pool.
+        """
+        keepalive_expiry = self.pool_limits.keepalive_expiry
+        assert keepalive_expiry is not None
+        while self.keepalive_connections:
+            delay = self.keepalive_connections.time_until_expiry(keepalive_expiry)
+            await self.backend.sleep(delay)
+            await self.close_expired_connections()
+
+    async def close_expired_connections(self) -> None:
+        """
+        Close any keep-alive connections that have been idle for longer than
+        the keep-alive expiry.
+        """
+        keepalive_expiry = self.pool_limits.keepalive_expiry
+        if keepalive_expiry is None:
+            return
+
+        for connection in self.keepalive_connections.pop_expired(keepalive_expiry):
+            self.counters["connections_expired"] += 1
+            self.release_slot(origin=connection.origin)
+            await connection.close()
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Return a snapshot of the current state of the pool, along with
+        cumulative counts of connection events since the pool was created.
+
+        Origins are keyed by strings such as "https://example.org:443", and
+        "pool_wait_time" is a histogram of the time taken by every call to
+        `acquire_connection()`, in seconds.
+        """
+        origins: typing.Dict[str, typing.Dict[str, int]] = {}
+        http_versions = {"HTTP/1.1": 0, "HTTP/2": 0}
+
+        def origin_stats(origin: Origin) -> typing.Dict[str, int]:
+            key = f"{origin.scheme}://{origin.host}:{origin.port}"
+            return origins.setdefault(key, {"active": 0, "idle": 0, "waiters": 0})
+
+        for state, store in (
+            ("active", self.active_connections),
+            ("idle", self.keepalive_connections),
+        ):
+            for connection in store:
+                origin_stats(connection.origin)[state] += 1
+                if connection.http_version is not None:
+                    http_versions[connection.http_version] += 1
+
+        for origin, num_waiters in self.waiters_by_origin.items():
+            origin_stats(origin)["waiters"] = num_waiters
+
+        return {
+            "active": len(self.active_connections),
+            "idle": len(self.keepalive_connections),
+            "waiters": sum(self.waiters_by_origin.values()),
+            "http_versions": http_versions,
+            "origins": origins,
+            **self.counters,
+            "ssl_session_hits": self.ssl_sessions.hits,
+            "ssl_session_misses": self.ssl_sessions.misses,
+            "pool_wait_time": self.pool_wait_time.snapshot(),
+        }
 
     async def close(self) -> None:
         self.is_closed = True
+        if self.keepalive_reaper is not None and self.keepalive_reaper.is_running():
+            self.keepalive_reaper.cancel()
+            await self.keepalive_reaper.join()
         connections = list(self.keepalive_connections)
         self.keepalive_connections.clear()
         for connection in connections:
@@ -1,10 +1,13 @@
+import collections
 import typing
 
 import h11
 
-from ..concurrency.base import BaseStream, ConcurrencyBackend, TimeoutFlag
+from ..concurrency.base import BaseEvent, BaseStream, ConcurrencyBackend, TimeoutFlag
 from ..config import TimeoutConfig, TimeoutTypes
 from ..models import AsyncRequest, AsyncResponse
+from ..utils import ReadSize
+from .parsers import get_http11_parser
 
 H11Event = typing.Union[
     h11.Request,
@@ -21,32 +24,81 @@ H11Event = typing.Union[
 # the `ConnectionPool.release_connection(conn: HTTPConnection)` method.
 OnReleaseCallback = typing.Callable[[], typing.Awaitable[None]]
 
+# Requests using these methods may be pipelined, provided they have no body.
+PIPELINE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class PipelineAborted(Exception):
+    """
+    Raised for a pipelined request that did not receive a response before
+    the connection failed. Only idempotent requests are pipelined, so the
+    request may safely be sent again on another connection.
+    """
+
+
+def is_pipelinable(request: AsyncRequest) -> bool:
+    return (
+        request.method in PIPELINE_METHODS
+        and not request.is_streaming
+        and not request.content
+    )
+
 
 class HTTP11Connection:
+    # Reads start at `READ_NUM_BYTES`, and grow up to `MAX_READ_NUM_BYTES`
+    # while we're receiving a large response body.
     READ_NUM_BYTES = 4096
+    MAX_READ_NUM_BYTES = 256 * 1024
+
+    # Request bodies up to this size are sent in a single write along with
+    # the request head. While streaming larger bodies, we only wait for the
+    # write buffer to drain once this much data has been written.
+    WRITE_HIGH_WATER_MARK = 64 * 1024
 
     def __init__(
         self,
         stream: BaseStream,
         backend: ConcurrencyBackend,
         on_release: typing.Optional[OnReleaseCallback] = None,
+        http11_parser: str = "h11",
+        pipeline_depth: int = 1,
     ):
         self.stream = stream
         self.backend = backend
         self.on_release = on_release
-        self.h11_state = h11.Connection(our_role=h11.CLIENT)
+        self.h11_state = get_http11_parser(http11_parser)
         self.timeout_flag = TimeoutFlag()
+        self.read_size = ReadSize(self.READ_NUM_BYTES, self.MAX_READ_NUM_BYTES)
+
+        # With a `pipeline_depth` greater than one, idempotent requests are
+        # written as soon as they're sent, and then read their responses in
+        # turn. The pipeline holds an event for each request in flight, which
+        # is set once it's that request's turn to read its response.
+        self.pipeline_depth = pipeline_depth
+        self.pipeline: typing.Deque[BaseEvent] = collections.deque()
+        self.pipeline_aborted = False
 
     async def send(
         self, request: AsyncRequest, timeout: TimeoutTypes = None
     ) -> AsyncResponse:
         timeout = None if timeout is None else TimeoutConfig(timeout)
 
-        await self._send_request(request, timeout)
-
-        task, args = self._send_request_data, [request.stream(), timeout]
-        async with self.backend.background_manager(task, *args):
+        if self.pipeline_depth > 1 and is_pipelinable(request):
+            response = await self._send_pipelined_request(request, timeout)
+            http_version, status_code, headers = response
+        elif (
+            not request.is_streaming
+            and len(request.content) <= self.WRITE_HIGH_WATER_MARK
+        ):
+            await self._send_complete_request(request, timeout)
             http_version, status_code, headers = await self._receive_response(timeout)
+        else:
+            await self._send_request(request, timeout)
+
+            task, args = self._send_request_data, [request.stream(), timeout]
+            async with self.backend.background_manager(task, *args):
+                response = await self._receive_response(timeout)
+                http_version, status_code, headers = response
         content = self._receive_response_data(timeout)
 
         return AsyncResponse(
@@ -73,11 +125,86 @@ class HTTP11Connection:
         """
         Send the request method, URL, and headers to the network.
         """
+        event = self._request_event(request)
+        await self._send_event(event, timeout)
+
+    def _request_event(self, request: AsyncRequest) -> h11.Request:
         method = request.method.encode("ascii")
         target = request.url.full_path.encode("ascii")
         headers = request.headers.raw
-        event = h11.Request(method=method, target=target, headers=headers)
-        await self._send_event(event, timeout)
+        return h11.Request(method=method, target=target, headers=headers)
+
+    async def _send_complete_request(
+        self, request: AsyncRequest, timeout: TimeoutConfig = None
+    ) -> None:
+        """
+        Send the request head and a small body to the network as a single write.
+        """
+        events = [self._request_event(request)]
+        if request.content:
+            events.append(h11.Data(data=request.content))
+        events.append(h11.EndOfMessage())
+
+        bytes_to_send = b"".join(self.h11_state.send(event) for event in events)
+        await self.stream.write(bytes_to_send, timeout)
+
+        # Once we've sent the request, we enable read timeouts.
+        self.timeout_flag.set_read_timeouts()
+
+    async def _send_pipelined_request(
+        self, request: AsyncRequest, timeout: TimeoutConfig = None
+    ) -> typing.Tuple[str, int, typing.List[typing.Tuple[bytes, bytes]]]:
+        """
+        Send a request without waiting for any earlier responses, and then
+        wait for our turn to read the response status and headers.
+        """
+        turn = self.backend.create_event()
+        self.pipeline.append(turn)
+        is_first = len(self.pipeline) == 1
+        try:
+            if is_first:
+                await self._send_complete_request(request, timeout)
+            else:
+                # The state machine is still busy with an earlier request, so
+                # we use a fresh one to produce the bytes to send.
+                h11_state = h11.Connection(our_role=h11.CLIENT)
+                events = [self._request_event(request), h11.EndOfMessage()]
+                bytes_to_send = b"".join(h11_state.send(event) for event in events)
+                await self.stream.write(bytes_to_send, timeout)
+
+                await turn.wait()
+                if self.pipeline_aborted:
+                    raise PipelineAborted()
+
+                # Catch the state machine up with the request we've already
+                # sent, so that it's ready to read our response.
+                for event in events:
+                    self.h11_state.send(event)
+                self.timeout_flag.set_read_timeouts()
+            return await self._receive_response(timeout)
+        except BaseException as exc:
+            # We can no longer read the responses to any requests behind
+            # this one, so give up on the connection.
+            await self.abort_pipeline()
+            # The first request on the pipeline fails just as it would without
+            # pipelining. Any others that failed for want of a response can be
+            # replayed, since an earlier request has now been answered.
+            if not is_first and isinstance(
+                exc, (PipelineAborted, OSError, h11.RemoteProtocolError)
+            ):
+                raise PipelineAborted() from exc
+            raise exc
+
+    async def abort_pipeline(self) -> None:
+        """
+        Close the connection, waking any pipelined requests that are still
+        waiting for their turn so that they fail with `PipelineAborted`.
+        """
+        self.pipeline_aborted = True
+        for turn in self.pipeline:
+            turn.set()
+        self.pipeline.clear()
+        await self.close()
 
     async def _send_request_data(
         self, data: typing.AsyncIterator[bytes], timeout: TimeoutConfig = None
@@ -86,10 +213,17 @@ class HTTP11Connection:
         Send the request body to the network.
         """
         try:
-            # Send the request body.
+            # Send the request body, only waiting for the write buffer to
+            # drain once we've written enough data since we last did so.
+            bytes_since_drain = 0
             async for chunk in data:
-                event = h11.Data(data=chunk)
-                await self._send_event(event, timeout)
+                bytes_to_send = self.h11_state.send(h11.Data(data=chunk))
+                bytes_since_drain += len(bytes_to_send)
+                if bytes_since_drain < self.WRITE_HIGH_WATER_MARK:
+                    self.stream.write_no_block(bytes_to_send)
+                else:
+                    await self.stream.write(bytes_to_send, timeout)
+                    bytes_since_drain = 0
 
             # Finalize sending the request.
             event = h11.EndOfMessage()
@@ -153,10 +287,11 @@ class HTTP11Connection:
             if event is h11.NEED_DATA:
                 try:
                     data = await self.stream.read(
-                        self.READ_NUM_BYTES, timeout, flag=self.timeout_flag
+                        self.read_size.value, timeout, flag=self.timeout_flag
                     )
                 except OSError:  # pragma: nocover
                     data = b""
+                self.read_size.update(len(data))
                 self.h11_state.receive_data(data)
             else:
                 assert event is not h11.NEED_DATA
@@ -164,19 +299,39 @@ class HTTP11Connection:
         return event
 
     async def response_closed(self) -> None:
-        if (
+        reusable = (
             self.h11_state.our_state is h11.DONE
             and self.h11_state.their_state is h11.DONE
-        ):
+        )
+        if reusable:
             # Get ready for another request/response cycle.
             self.h11_state.start_next_cycle()
             self.timeout_flag.set_write_timeouts()
         else:
             await self.close()
 
+        if self.pipeline:
+            self.pipeline.popleft()
+            if not reusable:
+                await self.abort_pipeline()
+            elif self.pipeline:
+                # Hand over to the next request in the pipeline, rather than
+                # releasing the connection.
+                self.pipeline[0].set()
+                return
+
         if self.on_release is not None:
             await self.on_release()
 
+    def can_pipeline(self) -> bool:
+        """
+        Return `True` if pipelined requests are in flight, and another request
+        may join them without exceeding the pipeline depth.
+        """
+        return (
+            0 < len(self.pipeline) < self.pipeline_depth and not self.pipeline_aborted
+        )
+
     @property
     def is_closed(self) -> bool:
         return self.h11_state.our_state in (h11.CLOSED, h11.ERROR)
@@ -7,10 +7,14 @@ import h2.events
 from ..concurrency.base import BaseStream, ConcurrencyBackend, TimeoutFlag
 from ..config import TimeoutConfig, TimeoutTypes
 from ..models import AsyncRequest, AsyncResponse
+from ..utils import ReadSize
 
 
 class HTTP2Connection:
+    # Reads start at `READ_NUM_BYTES`, and grow up to `MAX_READ_NUM_BYTES`
+    # while we're receiving large amounts of data.
     READ_NUM_BYTES = 4096
+    MAX_READ_NUM_BYTES = 256 * 1024
 
     def __init__(
         self,
@@ -24,6 +28,7 @@ class HTTP2Connection:
         self.h2_state = h2.connection.H2Connection()
         self.events = {}  # type: typing.Dict[int, typing.List[h2.events.Event]]
         self.timeout_flags = {}  # type: typing.Dict[int, TimeoutFlag]
+        self.read_size = ReadSize(self.READ_NUM_BYTES, self.MAX_READ_NUM_BYTES)
         self.initialized = False
 
     async def send(
@@ -37,9 +42,6 @@ class HTTP2Connection:
 
         stream_id = await self.send_headers(request, timeout)
 
-        self.events[stream_id] = []
-        self.timeout_flags[stream_id] = TimeoutFlag()
-
         task, args = self.send_request_data, [stream_id, request.stream(), timeout]
         async with self.backend.background_manager(task, *args):
             status_code, headers = await self.receive_response(stream_id, timeout)
@@ -75,6 +77,10 @@ class HTTP2Connection:
             (b":path", request.url.full_path.encode("ascii")),
         ] + [(k, v) for k, v in request.headers.raw if k != b"host"]
         self.h2_state.send_headers(stream_id, headers)
+        # Register the stream before we yield, so that it counts towards our
+        # open streams straight away.
+        self.events[stream_id] = []
+        self.timeout_flags[stream_id] = TimeoutFlag()
         data_to_send = self.h2_state.data_to_send()
         await self.stream.write(data_to_send, timeout)
         return stream_id
@@ -148,7 +154,8 @@ class HTTP2Connection:
     ) -> h2.events.Event:
         while not self.events[stream_id]:
             flag = self.timeout_flags[stream_id]
-            data = await self.stream.read(self.READ_NUM_BYTES, timeout, flag=flag)
+            data = await self.stream.read(self.read_size.value, timeout, flag=flag)
+            self.read_size.update(len(data))
             events = self.h2_state.receive_data(data)
             for event in events:
                 if getattr(event, "stream_id", 0):
@@ -166,6 +173,21 @@ class HTTP2Connection:
         if not self.events and self.on_release is not None:
             await self.on_release()
 
+    @property
+    def num_open_streams(self) -> int:
+        """
+        The number of streams that have been opened, and whose responses have
+        not yet been closed.
+        """
+        return len(self.events)
+
+    @property
+    def max_concurrent_streams(self) -> int:
+        return self.h2_state.remote_settings.max_concurrent_streams
+
+    def can_open_stream(self) -> bool:
+        return self.num_open_streams < self.max_concurrent_streams
+
     @property
     def is_closed(self) -> bool:
         return False
@@ -0,0 +1,232 @@
+"""
+HTTP/1.1 protocol engines, for use by `HTTP11Connection`.
+
+A protocol engine tracks the state of a single HTTP/1.1 connection, turning
+`h11` events into bytes to send, and bytes received back into `h11` events.
+The default engine is `h11.Connection` itself. The `httptools` engine instead
+parses responses with the much faster `httptools` library, while presenting
+the same interface.
+"""
+import collections
+import typing
+
+import h11
+
+try:
+    import httptools
+except ImportError:  # pragma: nocover
+    httptools = None  # type: ignore
+
+
+class HttpToolsParser:
+    """
+    A drop-in replacement for a client-side `h11.Connection`, which parses
+    responses using `httptools`.
+
+    Only the parts of the `h11.Connection` interface that `HTTP11Connection`
+    relies on are provided: `send()`, `send_failed()`, `receive_data()`,
+    `next_event()`, `start_next_cycle()`, and the `our_state` and
+    `their_state` attributes.
+
+    Requires `pip install httptools`. See https://github.com/MagicStack/httptools
+    """
+
+    def __init__(self) -> None:
+        assert (
+            httptools is not None
+        ), "The 'httptools' library must be installed to use 'HttpToolsParser'"
+        self.our_state = h11.IDLE
+        self.their_state = h11.IDLE
+        self.events: typing.Deque[typing.Any] = collections.deque()
+        self.parser: typing.Any = None
+        self.request_method = b""
+        self.keep_alive = True
+        self.chunked = False
+
+        # State for the response that we're currently parsing.
+        self.reason = b""
+        self.headers: typing.List[typing.Tuple[bytes, bytes]] = []
+        self.is_informational = False
+        self.is_close_delimited = False
+
+    # Sending the request...
+
+    def send(self, event: typing.Any) -> bytes:
+        if isinstance(event, h11.Request):
+            return self.send_request(event)
+        elif isinstance(event, h11.Data):
+            if self.chunked and event.data:
+                return b"%x\r\n%s\r\n" % (len(event.data), event.data)
+            return bytes(event.data)
+        elif isinstance(event, h11.EndOfMessage):
+            self.our_state = h11.DONE
+            self.check_keep_alive()
+            return b"0\r\n\r\n" if self.chunked else b""
+        assert isinstance(event, h11.ConnectionClosed)
+        self.our_state = h11.CLOSED
+        return b""
+
+    def send_request(self, event: h11.Request) -> bytes:
+        if self.our_state is not h11.IDLE:
+            raise h11.LocalProtocolError("Can't send a request in this state")
+
+        self.request_method = event.method
+        self.keep_alive = not has_token(event.headers, b"connection", b"close")
+        self.chunked = has_token(event.headers, b"transfer-encoding", b"chunked")
+        self.parser = httptools.HttpResponseParser(self)
+        self.our_state = h11.SEND_BODY
+        self.their_state = h11.SEND_RESPONSE
+
+        lines = [b"%s %s HTTP/1.1\r\n" % (event.method, event.target)]
+        lines.extend(b"%s: %s\r\n" % (name, value) for name, value in event.headers)
+        lines.append(b"\r\n")
+        return b"".join(lines)
+
+    def send_failed(self) -> None:
+        self.our_state = h11.ERROR
+
+    # Receiving the response...
+
+    def receive_data(self, data: bytes) -> None:
+        if not data:
+            self.receive_eof()
+            return
+
+        if self.their_state not in (h11.SEND_RESPONSE, h11.SEND_BODY):
+            # Any data received outside of a response, other than for the
+            # body of a response to a HEAD request, is a protocol error.
+            if self.request_method == b"HEAD":
+                return
+            self.their_state = h11.ERROR
+            raise h11.RemoteProtocolError("Received data outside of a response")
+
+        try:
+            self.parser.feed_data(data)
+        except httptools.HttpParserError as exc:
+            self.their_state = h11.ERROR
+            raise h11.RemoteProtocolError(str(exc)) from None
+
+    def receive_eof(self) -> None:
+        if self.their_state is h11.SEND_BODY and self.is_close_delimited:
+            self.on_message_complete()
+        elif self.their_state in (h11.SEND_RESPONSE, h11.SEND_BODY):
+            self.their_state = h11.ERROR
+            raise h11.RemoteProtocolError(
+                "peer closed connection without sending complete message body"
+            )
+        else:
+            self.events.append(h11.ConnectionClosed())
+            self.their_state = h11.CLOSED
+
+    def next_event(self) -> typing.Any:
+        if self.events:
+            return self.events.popleft()
+        return h11.NEED_DATA
+
+    def start_next_cycle(self) -> None:
+        if self.our_state is not h11.DONE or self.their_state is not h11.DONE:
+            raise h11.LocalProtocolError("Not in a reusable state")
+        self.our_state = h11.IDLE
+        self.their_state = h11.IDLE
+        self.parser = None
+        self.request_method = b""
+
+    def check_keep_alive(self) -> None:
+        if not self.keep_alive:
+            for state in ("our_state", "their_state"):
+                if getattr(self, state) is h11.DONE:
+                    setattr(self, state, h11.MUST_CLOSE)
+
+    # Callbacks from `httptools`...
+
+    def on_status(self, reason: bytes) -> None:
+        self.reason += reason
+
+    def on_header(self, name: bytes, value: bytes) -> None:
+        self.headers.append((name, value))
+
+    def on_headers_complete(self) -> None:
+        status_code = self.parser.get_status_code()
+        http_version = self.parser.get_http_version().encode("ascii")
+        # The headers have already been validated by the parser.
+        kwargs = {
+            "status_code": status_code,
+            "headers": self.headers,
+            "http_version": http_version,
+            "reason": self.reason,
+            "_parsed": True,
+        }
+        self.reason = b""
+        self.headers = []
+        self.is_informational = status_code < 200
+        if self.is_informational:
+            self.events.append(h11.InformationalResponse(**kwargs))
+            return
+
+        event = h11.Response(**kwargs)
+        self.events.append(event)
+        self.their_state = h11.SEND_BODY
+        if http_version != b"1.1" or has_token(
+            event.headers, b"connection", b"close"
+        ):
+            self.keep_alive = False
+
+        if self.request_method == b"HEAD":
+            # Responses to HEAD requests never have a body, even if they
+            # include a `Content-Length` header, which `httptools` would
+            # otherwise wait on.
+            self.on_message_complete()
+            return
+
+        framing_headers = (b"content-length", b"transfer-encoding")
+        self.is_close_delimited = status_code not in (204, 304) and not any(
+            name in framing_headers for name, _ in event.headers
+        )
+        if self.is_close_delimited:
+            self.keep_alive = False
+
+    def on_body(self, body: bytes) -> None:
+        if self.their_state is h11.SEND_BODY:
+            self.events.append(h11.Data(data=body))
+
+    def on_message_complete(self) -> None:
+        if self.is_informational or self.their_state is not h11.SEND_BODY:
+            return
+        self.events.append(h11.EndOfMessage())
+        self.their_state = h11.DONE
+        self.check_keep_alive()
+
+
+def has_token(
+    headers: typing.List[typing.Tuple[bytes, bytes]], name: bytes, token: bytes
+) -> bool:
+    """
+    Return `True` if the given comma separated header includes `token`.
+    Header names must already be lowercased.
+    """
+    for key, value in headers:
+        if key == name and token in [
+            item.strip().lower() for item in value.split(b",")
+        ]:
+            return True
+    return False
+
+
+HTTP11_PARSERS: typing.Dict[str, typing.Callable[[], typing.Any]] = {
+    "h11": lambda: h11.Connection(our_role=h11.CLIENT),
+    "httptools": HttpToolsParser,
+}
+
+
+def get_http11_parser(name: str) -> typing.Any:
+    """
+    Return a new HTTP/1.1 protocol engine, given its name in `HTTP11_PARSERS`.
+    """
+    try:
+        parser_class = HTTP11_PARSERS[name]
+    except KeyError:
+        choices = ", ".join(repr(choice) for choice in HTTP11_PARSERS)
+        raise ValueError(
+            f"Unknown HTTP/1.1 parser {name!r}, expected one of {choices}"
+        ) from None
+    return parser_class()
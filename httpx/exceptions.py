@@ -53,6 +53,13 @@ class PoolTimeout(Timeout):
     """
 
 
+class TotalTimeout(Timeout):
+    """
+    Timeout while sending a request and receiving its response, including
+    any redirects.
+    """
+
+
 # HTTP exceptions...
 
 
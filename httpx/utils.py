@@ -140,3 +140,30 @@ def parse_header_links(value: str) -> typing.List[typing.Dict[str, str]]:
             link[key.strip(replace_chars)] = value.strip(replace_chars)
         links.append(link)
     return links
+
+
+class ReadSize:
+    """
+    Chooses how many bytes to ask for on each read from the network.
+
+    We start off small, and double the read size each time a read fills it
+    completely, since that's a good sign of a sustained transfer, where
+    larger reads mean fewer round trips through the event loop and parser.
+    Once reads start coming back well short of the read size, we back off
+    again, down to the initial size.
+    """
+
+    def __init__(self, initial: int = 4096, maximum: int = 256 * 1024) -> None:
+        assert 0 < initial <= maximum
+        self.initial = initial
+        self.maximum = maximum
+        self.value = initial
+
+    def update(self, num_bytes: int) -> None:
+        """
+        Adjust the read size, given the number of bytes the last read returned.
+        """
+        if num_bytes >= self.value:
+            self.value = min(self.value * 2, self.maximum)
+        elif num_bytes < self.value // 4:
+            self.value = max(self.value // 2, self.initial)
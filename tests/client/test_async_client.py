@@ -133,3 +133,25 @@ async def test_100_continue(server):
 
     assert response.status_code == 200
     assert response.content == data
+
+
+@pytest.mark.asyncio
+async def test_preconnect(server):
+    url = "http://127.0.0.1:8000/"
+    async with httpx.AsyncClient() as client:
+        await client.preconnect(url, count=2)
+        assert len(client.dispatch.keepalive_connections) == 2
+
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert client.dispatch.stats()["connections_reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_preconnect_option(server):
+    urls = ["http://127.0.0.1:8000/", "http://127.0.0.1:8000/", "http://localhost:8000"]
+    async with httpx.AsyncClient(preconnect=urls) as client:
+        stats = client.dispatch.stats()
+        assert stats["idle"] == 3
+        assert stats["origins"]["http://127.0.0.1:8000"]["idle"] == 2
+        assert stats["origins"]["http://localhost:8000"]["idle"] == 1
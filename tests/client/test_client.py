@@ -174,3 +174,12 @@ def test_client_backend_must_be_asyncio_based():
 
     with pytest.raises(ValueError):
         httpx.Client(backend=AnyBackend())
+
+
+@threadpool
+def test_preconnect(server):
+    url = "http://127.0.0.1:8000/"
+    with httpx.Client(preconnect=[url]) as http:
+        assert len(http.dispatch.keepalive_connections) == 1
+        http.preconnect(url)
+        assert len(http.dispatch.keepalive_connections) == 2
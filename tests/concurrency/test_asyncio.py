@@ -0,0 +1,708 @@
+import asyncio
+import socket
+import ssl
+import time
+
+import pytest
+
+import httpx
+from httpx import (
+    AsyncioBackend,
+    BaseResolver,
+    PoolLimits,
+    PoolTimeout,
+    ReadTimeout,
+    Resolver,
+    TimeoutConfig,
+    WriteTimeout,
+)
+from httpx.concurrency.asyncio import (
+    IOTimeout,
+    ProtocolStream,
+    SessionSSLContext,
+    StreamProtocol,
+    close_connected_socket,
+    interleave_addresses,
+)
+from httpx.concurrency.base import TimeoutFlag
+
+
+async def acquire_and_release(semaphore, name, order, priority=0):
+    await semaphore.acquire(priority=priority)
+    order.append(name)
+    semaphore.release()
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_is_fifo():
+    semaphore = AsyncioBackend().get_semaphore(PoolLimits(hard_limit=1))
+    order = []
+
+    await semaphore.acquire()
+    tasks = [
+        asyncio.ensure_future(acquire_and_release(semaphore, name, order))
+        for name in ("a", "b", "c")
+    ]
+    await asyncio.sleep(0)
+    assert semaphore.num_waiters == 3
+
+    semaphore.release()
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b", "c"]
+    assert semaphore.num_waiters == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_priority():
+    semaphore = AsyncioBackend().get_semaphore(PoolLimits(hard_limit=1))
+    order = []
+
+    await semaphore.acquire()
+    tasks = [
+        asyncio.ensure_future(
+            acquire_and_release(semaphore, name, order, priority=priority)
+        )
+        for name, priority in (("bulk-1", 0), ("urgent", 1), ("bulk-2", 0))
+    ]
+    await asyncio.sleep(0)
+
+    semaphore.release()
+    await asyncio.gather(*tasks)
+    assert order == ["urgent", "bulk-1", "bulk-2"]
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_timeout():
+    limits = PoolLimits(hard_limit=1, pool_timeout=0.01)
+    semaphore = AsyncioBackend().get_semaphore(limits)
+
+    await semaphore.acquire()
+    with pytest.raises(PoolTimeout):
+        await semaphore.acquire()
+    assert semaphore.num_waiters == 0
+
+    # A waiter that times out shouldn't prevent the slot from being released.
+    semaphore.release()
+    await semaphore.acquire()
+    semaphore.release()
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_timeouts_with_single_timer():
+    limits = PoolLimits(hard_limit=1, pool_timeout=0.05)
+    semaphore = AsyncioBackend().get_semaphore(limits)
+
+    await semaphore.acquire()
+    first = asyncio.ensure_future(semaphore.acquire())
+    await asyncio.sleep(0.02)
+    second = asyncio.ensure_future(semaphore.acquire())
+    await asyncio.sleep(0)
+
+    # Once the first waiter is granted a slot the timer is left in place,
+    # and then re-armed for the second waiter's deadline when it fires.
+    semaphore.release()
+    await first
+    with pytest.raises(PoolTimeout):
+        await second
+    assert semaphore.num_waiters == 0
+
+    semaphore.release()
+    assert semaphore.timer is None
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_explicit_timeout():
+    limits = PoolLimits(hard_limit=1, pool_timeout=60.0)
+    semaphore = AsyncioBackend().get_semaphore(limits)
+
+    await semaphore.acquire()
+    first = asyncio.ensure_future(semaphore.acquire())
+    await asyncio.sleep(0)
+
+    # A shorter timeout than the pool timeout should move the timer forward.
+    with pytest.raises(PoolTimeout):
+        await semaphore.acquire(timeout=0.01)
+    assert semaphore.num_waiters == 1
+
+    semaphore.release()
+    await first
+    semaphore.release()
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_granted_before_timeout():
+    limits = PoolLimits(hard_limit=1, pool_timeout=5.0)
+    semaphore = AsyncioBackend().get_semaphore(limits)
+
+    await semaphore.acquire()
+    waiter = asyncio.ensure_future(semaphore.acquire())
+    await asyncio.sleep(0)
+    assert semaphore.timer is not None
+
+    semaphore.release()
+    await waiter
+    semaphore.release()
+    assert semaphore.timer is None
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_cancelled_waiter():
+    semaphore = AsyncioBackend().get_semaphore(PoolLimits(hard_limit=1))
+    order = []
+
+    await semaphore.acquire()
+    cancelled = asyncio.ensure_future(acquire_and_release(semaphore, "a", order))
+    waiting = asyncio.ensure_future(acquire_and_release(semaphore, "b", order))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert semaphore.num_waiters == 1
+
+    semaphore.release()
+    await waiting
+    assert order == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_cancelled_after_being_granted():
+    semaphore = AsyncioBackend().get_semaphore(PoolLimits(hard_limit=1))
+    order = []
+
+    await semaphore.acquire()
+    cancelled = asyncio.ensure_future(acquire_and_release(semaphore, "a", order))
+    waiting = asyncio.ensure_future(acquire_and_release(semaphore, "b", order))
+    await asyncio.sleep(0)
+
+    # Hand the slot over to the first waiter, but cancel it before it runs.
+    semaphore.release()
+    cancelled.cancel()
+    await waiting
+    assert order == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_cancelled_after_timing_out():
+    limits = PoolLimits(hard_limit=1, pool_timeout=0.0)
+    semaphore = AsyncioBackend().get_semaphore(limits)
+
+    await semaphore.acquire()
+    waiter = asyncio.ensure_future(semaphore.acquire())
+    await asyncio.sleep(0)
+
+    # Time the waiter out, and then cancel it before it gets to run again.
+    semaphore.expire_waiters(asyncio.get_event_loop())
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert semaphore.num_waiters == 0
+
+    # The waiter never held a slot, so it mustn't have released one.
+    semaphore.release()
+    with pytest.raises(ValueError):
+        semaphore.release()
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_released_too_many_times():
+    semaphore = AsyncioBackend().get_semaphore(PoolLimits(hard_limit=1))
+    await semaphore.acquire()
+    semaphore.release()
+    with pytest.raises(ValueError):
+        semaphore.release()
+
+
+@pytest.mark.asyncio
+async def test_pool_semaphore_without_limit():
+    semaphore = AsyncioBackend().get_semaphore(PoolLimits())
+    for _ in range(3):
+        await semaphore.acquire()
+    semaphore.release()
+    assert semaphore.num_waiters == 0
+
+
+@pytest.mark.asyncio
+async def test_io_timeout_armed_when_flag_switches():
+    flag = TimeoutFlag()
+    asyncio.get_event_loop().call_later(0.05, flag.set_read_timeouts)
+
+    with pytest.raises(ReadTimeout):
+        with IOTimeout(0.01, flag, ReadTimeout):
+            await asyncio.sleep(1)
+    assert not flag.listeners
+
+
+@pytest.mark.asyncio
+async def test_io_timeout_disarmed_when_flag_switches():
+    flag = TimeoutFlag()
+
+    with pytest.raises(WriteTimeout):
+        with IOTimeout(0.01, flag, WriteTimeout):
+            await asyncio.sleep(1)
+
+    with IOTimeout(0.01, flag, WriteTimeout) as io_timeout:
+        flag.set_read_timeouts()
+        await asyncio.sleep(0.05)
+    assert not io_timeout.expired
+
+
+@pytest.mark.asyncio
+async def test_io_timeout_nested_timeouts_expiring_together():
+    outer = IOTimeout(0.01, None, PoolTimeout)
+    inner = IOTimeout(0.01, None, ReadTimeout)
+
+    with pytest.raises(ReadTimeout):
+        with outer:
+            with inner:
+                # Let both timers fire before the task next gets to run.
+                time.sleep(0.02)
+                await asyncio.sleep(1)
+    assert outer.expired and inner.expired
+    assert not IOTimeout.expired_tasks
+
+
+def test_task_from_previous_loop_is_not_running():
+    backend = AsyncioBackend()
+    previous_loop = backend.loop
+
+    async def start_task():
+        return backend.create_task(asyncio.sleep, 60)
+
+    task = backend.run(start_task)
+    assert task.is_running()
+
+    backend._loop = asyncio.new_event_loop()
+    try:
+        assert not task.is_running()
+    finally:
+        backend._loop.close()
+        task.cancel()
+        previous_loop.run_until_complete(task.join())
+
+
+def test_interleave_addresses():
+    v6 = [(socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", n, 0, 0)) for n in "abc"]
+    v4 = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", n)) for n in "de"]
+
+    assert interleave_addresses(v6 + v4) == [v6[0], v4[0], v6[1], v4[1], v6[2]]
+    assert interleave_addresses(v6 + v4, 2) == [v6[0], v6[1], v4[0], v6[2], v4[1]]
+    assert interleave_addresses(v4) == v4
+
+
+@pytest.fixture
+async def listeners():
+    """
+    Listen on both the IPv6 and IPv4 loopback addresses, and return the
+    resolved addresses for them, IPv6 first.
+    """
+    servers = [
+        await asyncio.start_server(lambda reader, writer: writer.close(), host, 0)
+        for host in ("::1", "127.0.0.1")
+    ]
+    addresses = [
+        (sock.family, socket.SOCK_STREAM, 6, "", sock.getsockname())
+        for server in servers
+        for sock in server.sockets
+    ]
+    try:
+        yield addresses
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+
+class MockResolver(BaseResolver):
+    def __init__(self, addresses):
+        self.addresses = addresses
+
+    async def resolve(self, hostname, port):
+        return self.addresses
+
+
+async def connected_host(backend):
+    stream = await backend.connect("example.org", 80, None, TimeoutConfig(5.0))
+    try:
+        return stream.stream_writer.get_extra_info("peername")[0]
+    finally:
+        await stream.close()
+
+
+class StallingBackend(AsyncioBackend):
+    """
+    A backend on which connection attempts to some hosts never complete.
+    """
+
+    def __init__(self, stalled_hosts, **kwargs):
+        super().__init__(**kwargs)
+        self.stalled_hosts = stalled_hosts
+        self.cancelled = []
+
+    async def connect_address(self, address):
+        if address[4][0] in self.stalled_hosts:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                self.cancelled.append(address[4][0])
+                raise
+        return await super().connect_address(address)
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_prefers_first_address(listeners):
+    backend = AsyncioBackend()
+    backend.resolver = MockResolver(listeners)
+    assert await connected_host(backend) == "::1"
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_stalled_address(listeners):
+    backend = StallingBackend(stalled_hosts=["::1"], happy_eyeballs_delay=0.01)
+    backend.resolver = MockResolver(listeners)
+    assert await connected_host(backend) == "127.0.0.1"
+    await asyncio.sleep(0)
+    assert backend.cancelled == ["::1"]
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_failed_address(listeners):
+    """
+    A failed attempt should move straight on to the next address, even
+    when attempts are not staggered.
+    """
+    backend = AsyncioBackend(happy_eyeballs_delay=None)
+    unused = (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", 1, 0, 0))
+    backend.resolver = MockResolver([unused] + listeners[1:])
+    assert await connected_host(backend) == "127.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_failed_after_delay(listeners):
+    backend = StallingBackend(stalled_hosts=["127.0.0.1"], happy_eyeballs_delay=0.01)
+    unused = (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", 1, 0, 0))
+    backend.resolver = MockResolver([listeners[1], unused, listeners[0]])
+    assert await connected_host(backend) == "::1"
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_all_addresses_fail():
+    backend = AsyncioBackend()
+    v6 = (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", 1, 0, 0))
+    v4 = (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 1))
+
+    backend.resolver = MockResolver([v4])
+    with pytest.raises(ConnectionRefusedError):
+        await connected_host(backend)
+
+    backend.resolver = MockResolver([v6, v4])
+    with pytest.raises(OSError, match="Multiple exceptions"):
+        await connected_host(backend)
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_simultaneous_connections(listeners, monkeypatch):
+    """
+    If several attempts connect at once, only one socket should be kept.
+    """
+    backend = AsyncioBackend(happy_eyeballs_delay=0.0)
+    backend.resolver = MockResolver(listeners)
+    sockets = []
+    connect_address = backend.connect_address
+
+    async def connect_together(address):
+        sock = await connect_address(address)
+        sockets.append(sock)
+        await asyncio.sleep(0.01)
+        return sock
+
+    monkeypatch.setattr(backend, "connect_address", connect_together)
+    stream = await backend.connect("example.org", 80, None, TimeoutConfig(5.0))
+    assert len(sockets) == 2
+    assert len([sock for sock in sockets if sock.fileno() == -1]) == 1
+    await stream.close()
+
+
+@pytest.mark.asyncio
+async def test_close_connected_socket():
+    """
+    A losing attempt that connects before it is cancelled should be closed.
+    """
+    sock, other = socket.socketpair()
+    attempt = asyncio.get_event_loop().create_future()
+    attempt.set_result(sock)
+    close_connected_socket(attempt)
+    assert sock.fileno() == -1
+    other.close()
+
+
+def mock_getaddrinfo(monkeypatch, *results):
+    """
+    Patch `getaddrinfo()` on the running event loop to return each of the
+    given results in turn, and return the list of calls made.
+    """
+    calls = []
+    results = list(results)
+
+    async def getaddrinfo(host, port, **kwargs):
+        calls.append((host, port))
+        await asyncio.sleep(0)
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(asyncio.get_event_loop(), "getaddrinfo", getaddrinfo)
+    return calls
+
+
+V4 = [
+    (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.%d" % n, 80))
+    for n in (1, 2, 3)
+]
+V6 = [(socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", 80, 0, 0))]
+
+
+@pytest.mark.asyncio
+async def test_resolver_caches_lookups(monkeypatch):
+    calls = mock_getaddrinfo(monkeypatch, V4, V4, V4)
+    resolver = Resolver(rotate=False)
+
+    assert await resolver.resolve("example.org", 80) == V4
+    assert await resolver.resolve("example.org", 80) == V4
+    assert calls == [("example.org", 80)]
+
+    resolver.ttl = 0.0
+    assert await resolver.resolve("example.org", 443) == V4
+    assert await resolver.resolve("example.org", 443) == V4
+    assert calls == [("example.org", 80), ("example.org", 443), ("example.org", 443)]
+
+
+@pytest.mark.asyncio
+async def test_resolver_caches_failures(monkeypatch):
+    error = socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+    calls = mock_getaddrinfo(monkeypatch, error, V4)
+    resolver = Resolver()
+
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            await resolver.resolve("example.org", 80)
+    assert len(calls) == 1
+
+    # Once the failure has expired we should look the hostname up again.
+    resolver.cache[("example.org", 80)] = (0.0, error)
+    assert await resolver.resolve("example.org", 80) == V4
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_resolver_single_flight(monkeypatch):
+    calls = mock_getaddrinfo(monkeypatch, V4)
+    resolver = Resolver(rotate=False)
+
+    cancelled = asyncio.ensure_future(resolver.resolve("example.org", 80))
+    others = [
+        asyncio.ensure_future(resolver.resolve("example.org", 80)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await asyncio.gather(*others) == [V4, V4, V4]
+    assert len(calls) == 1
+    assert resolver.lookups == {}
+
+
+@pytest.mark.asyncio
+async def test_resolver_overrides(monkeypatch):
+    calls = mock_getaddrinfo(monkeypatch)
+    overrides = {"example.org": "127.0.0.1", "example.org:443": ["::1", "127.0.0.2"]}
+    resolver = Resolver(overrides=overrides)
+
+    addresses = await resolver.resolve("example.org", 80)
+    assert [address[4] for address in addresses] == [("127.0.0.1", 80)]
+
+    addresses = await resolver.resolve("example.org", 443)
+    assert [address[4][0] for address in addresses] == ["::1", "127.0.0.2"]
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_resolver_rotates_addresses(monkeypatch):
+    mock_getaddrinfo(monkeypatch, V6 + V4)
+    resolver = Resolver()
+
+    assert await resolver.resolve("example.org", 80) == V6 + V4
+    assert await resolver.resolve("example.org", 80) == V6 + V4[1:] + V4[:1]
+    assert await resolver.resolve("example.org", 80) == V6 + V4[2:] + V4[:2]
+
+
+@pytest.mark.asyncio
+async def test_backend_uses_resolver(server):
+    resolver = Resolver(overrides={"example.org": "127.0.0.1"})
+    backend = AsyncioBackend(resolver=resolver)
+
+    async with httpx.ConnectionPool(backend=backend) as http:
+        response = await http.request("GET", "http://example.org:8000/")
+        await response.read()
+    assert response.status_code == 200
+
+
+def test_session_ssl_context_proxies_ssl_context():
+    ssl_context = ssl.create_default_context()
+    session_context = SessionSSLContext(ssl_context, session=None)
+    assert session_context.verify_mode == ssl_context.verify_mode
+    assert session_context.check_hostname is True
+
+
+class MockTransport(asyncio.Transport):
+    def __init__(self):
+        super().__init__()
+        self.written = []
+        self.reading_paused = False
+        self.closed = False
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def write(self, data):
+        self.written.append(data)
+
+    def pause_reading(self):
+        self.reading_paused = True
+
+    def resume_reading(self):
+        self.reading_paused = False
+
+    def close(self):
+        self.closed = True
+
+
+def protocol_stream():
+    protocol = StreamProtocol()
+    protocol.connection_made(MockTransport())
+    return ProtocolStream(protocol=protocol, timeout=TimeoutConfig(5.0))
+
+
+def receive(protocol, data):
+    protocol.data_received(data)
+
+
+@pytest.mark.asyncio
+async def test_protocol_streams(server, https_server):
+    backend = AsyncioBackend(protocol_streams=True)
+
+    async with httpx.ConnectionPool(backend=backend, verify=False) as http:
+        for url in ("http://127.0.0.1:8000/", "https://127.0.0.1:8001/"):
+            for _ in range(2):
+                response = await http.request("GET", url)
+                await response.read()
+                assert response.content == b"Hello, world!"
+
+        data = b"x" * 1024 * 1024
+        response = await http.request(
+            "POST", "http://127.0.0.1:8000/echo_body", data=data
+        )
+        await response.read()
+        assert response.content == data
+
+        stats = http.stats()
+        assert stats["connections_created"] == 2
+        assert stats["connections_reused"] == 3
+        for connection in http.keepalive_connections:
+            assert isinstance(connection.stream, ProtocolStream)
+
+
+@pytest.mark.asyncio
+async def test_protocol_stream_read_timeout(server):
+    backend = AsyncioBackend(protocol_streams=True)
+    timeout = TimeoutConfig(read_timeout=0.000001)
+
+    async with httpx.ConnectionPool(backend=backend, timeout=timeout) as http:
+        with pytest.raises(ReadTimeout):
+            await http.request("GET", "http://127.0.0.1:8000/slow_response")
+
+
+@pytest.mark.asyncio
+async def test_protocol_stream_reads():
+    stream = protocol_stream()
+    protocol = stream.protocol
+
+    reading = asyncio.ensure_future(stream.read(5))
+    await asyncio.sleep(0)
+    receive(protocol, b"Hello, world!")
+    assert await reading == b"Hello"
+    assert await stream.read(100) == b", world!"
+    assert protocol.start == protocol.end == 0
+
+    protocol.eof_received()
+    assert stream.is_connection_dropped()
+    assert await stream.read(100) == b""
+
+
+@pytest.mark.asyncio
+async def test_protocol_stream_buffering():
+    stream = protocol_stream()
+    protocol = stream.protocol
+    transport = protocol.transport
+
+    # Fill the buffer past its high water mark, so that we stop reading.
+    chunk = b"x" * StreamProtocol.BUFFER_SIZE
+    for _ in range(StreamProtocol.HIGH_WATER_MARK // len(chunk)):
+        receive(protocol, chunk)
+    assert len(protocol.buffer) > StreamProtocol.BUFFER_SIZE
+    assert transport.reading_paused
+
+    # Draining it again resumes reading.
+    await stream.read(StreamProtocol.HIGH_WATER_MARK // 2 + 1)
+    assert not transport.reading_paused
+
+    # Unread data is moved to the start of the buffer to make space, rather
+    # than growing the buffer.
+    buffer_size = len(protocol.buffer)
+    receive(protocol, chunk)
+    assert protocol.start == 0
+    assert len(protocol.buffer) == buffer_size
+
+    remaining = protocol.num_unread
+    assert len(await stream.read(remaining)) == remaining
+
+
+@pytest.mark.asyncio
+async def test_protocol_stream_write_flow_control():
+    stream = protocol_stream()
+    protocol = stream.protocol
+
+    await stream.write(b"")
+    stream.write_no_block(b"Hello")
+    await stream.write(b", world!")
+    assert protocol.transport.written == [b"Hello", b", world!"]
+
+    protocol.pause_writing()
+    writing = asyncio.ensure_future(stream.write(b"!"))
+    await asyncio.sleep(0)
+    assert not writing.done()
+    protocol.resume_writing()
+    await writing
+
+    protocol.pause_writing()
+    with pytest.raises(WriteTimeout):
+        await stream.write(b"!", timeout=TimeoutConfig(write_timeout=0.01))
+
+    await stream.close()
+    assert protocol.transport.closed
+
+
+@pytest.mark.asyncio
+async def test_protocol_stream_connection_lost():
+    stream = protocol_stream()
+    protocol = stream.protocol
+
+    protocol.pause_writing()
+    reading = asyncio.ensure_future(stream.read(100))
+    writing = asyncio.ensure_future(stream.write(b"Hello"))
+    await asyncio.sleep(0)
+    protocol.connection_lost(ConnectionResetError())
+
+    with pytest.raises(ConnectionResetError):
+        await reading
+    await writing
+    with pytest.raises(ConnectionResetError):
+        await stream.write(b"Hello")
@@ -1,6 +1,9 @@
+import asyncio
+
 import pytest
 
 import httpx
+from httpx.dispatch import connection_pool
 
 
 @pytest.mark.asyncio
@@ -56,6 +59,97 @@ async def test_soft_limit(server):
         assert len(http.keepalive_connections) == 1
 
 
+class MockClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_keepalive_expiry(server, monkeypatch):
+    """
+    Idle keep-alive connections should be closed once they have expired.
+    """
+    clock = MockClock()
+    monkeypatch.setattr(connection_pool, "time", clock)
+    pool_limits = httpx.PoolLimits(keepalive_expiry=10.0)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+
+        clock.now = 6.0
+        response = await http.request("GET", "http://localhost:8000/")
+        await response.read()
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 2
+
+        clock.now = 13.0
+        await http.close_expired_connections()
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 1
+
+        clock.now = 16.0
+        await http.close_expired_connections()
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 0
+        assert http.stats()["connections_expired"] == 2
+
+
+@pytest.mark.asyncio
+async def test_keepalive_reaper(server):
+    """
+    Expired keep-alive connections should be closed in the background, and
+    the reaper should stop once there are no keep-alive connections left.
+    """
+    pool_limits = httpx.PoolLimits(keepalive_expiry=0.01)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        for _ in range(2):
+            response = await http.request("GET", "http://127.0.0.1:8000/")
+            await response.read()
+            assert len(http.keepalive_connections) == 1
+
+            reaper = http.keepalive_reaper
+            await reaper.join()
+            assert not reaper.is_running()
+            assert len(http.keepalive_connections) == 0
+
+
+@pytest.mark.asyncio
+async def test_keepalive_reaper_cancelled_on_close(server):
+    pool_limits = httpx.PoolLimits(keepalive_expiry=60.0)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        reaper = http.keepalive_reaper
+        assert reaper.is_running()
+
+    assert not reaper.is_running()
+
+
+@pytest.mark.asyncio
+async def test_expired_connection_not_reused(server):
+    """
+    Expired keep-alive connections should not be reused, even if they have
+    not yet been closed in the background.
+    """
+    pool_limits = httpx.PoolLimits(keepalive_expiry=0.0)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        connection = next(iter(http.keepalive_connections))
+
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        assert connection.is_closed
+        assert connection not in http.active_connections
+        await response.read()
+
+
 @pytest.mark.asyncio
 async def test_streaming_response_holds_connection(server):
     """
@@ -189,3 +283,496 @@ async def test_connection_closed_free_semaphore_on_acquire(server):
 
         response = await http.request("GET", "http://127.0.0.1:8000/")
         assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_hard_limit_per_origin(server):
+    """
+    The hard_limit_per_origin config should limit the number of connections
+    to a single origin, without affecting other origins.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit_per_origin=1, pool_timeout=0.000001)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+
+        with pytest.raises(httpx.PoolTimeout):
+            await http.request("GET", "http://127.0.0.1:8000/")
+
+        other_response = await http.request("GET", "http://localhost:8000/")
+        await other_response.read()
+        await response.read()
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 2
+
+
+@pytest.mark.asyncio
+async def test_hard_limit_evicts_idle_connection_to_other_origin(server):
+    """
+    Idle keep-alive connections to one origin should not prevent us from
+    connecting to another origin, once the hard limit has been reached.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit=1, pool_timeout=0.000001)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        idle_connection = list(http.keepalive_connections)[0]
+
+        response = await http.request("GET", "http://localhost:8000/")
+        await response.read()
+        assert idle_connection.is_closed
+        assert len(http.keepalive_connections) == 1
+        assert list(http.keepalive_connections)[0].origin == httpx.Origin(
+            "http://localhost:8000"
+        )
+        assert http.stats()["connections_evicted"] == 1
+
+        # Connections to the same origin are reused rather than evicted.
+        response = await http.request("GET", "http://localhost:8000/")
+        await response.read()
+        assert http.stats()["connections_evicted"] == 1
+        assert http.stats()["connections_reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hard_limit_hands_released_connection_to_waiter(server):
+    """
+    A connection released while other requests are waiting for a slot
+    should be closed, rather than held onto as an idle connection.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit=1, hard_limit_per_origin=1)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        waiting = asyncio.ensure_future(http.request("GET", "http://localhost:8000/"))
+        await asyncio.sleep(0.01)
+
+        await response.read()
+        response = await waiting
+        await response.read()
+        assert len(http.keepalive_connections) == 1
+        assert http.stats()["connections_evicted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_spans_both_limits(monkeypatch):
+    """
+    Time spent waiting on the per-origin limit should count towards the
+    pool timeout when then waiting on the overall hard limit.
+    """
+    clock = MockClock()
+    monkeypatch.setattr(connection_pool, "time", clock)
+    pool_limits = httpx.PoolLimits(
+        hard_limit=1, hard_limit_per_origin=1, pool_timeout=60.0
+    )
+    origin_a = httpx.Origin("http://a.example.org")
+    origin_b = httpx.Origin("http://b.example.org")
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        await http.acquire_slot(origin_a)
+        waiting_b = asyncio.ensure_future(http.acquire_slot(origin_b))
+        waiting_a = asyncio.ensure_future(http.acquire_slot(origin_a))
+        await asyncio.sleep(0)
+
+        # The overall slot is handed to `b`, leaving `a` with no time left to
+        # wait for it.
+        clock.now = 61.0
+        http.release_slot(origin_a)
+        await waiting_b
+        with pytest.raises(httpx.PoolTimeout):
+            await waiting_a
+
+        http.release_slot(origin_b)
+        assert http.max_origin_connections == {}
+
+
+@pytest.mark.asyncio
+async def test_hard_limit_per_origin_released_on_close(server):
+    """
+    Once all the connections to an origin have closed, the pool should
+    no longer need to track a per-origin limit for it.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit_per_origin=1)
+    headers = [(b"connection", b"close")]
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/", headers=headers)
+        assert len(http.max_origin_connections) == 1
+
+        await response.read()
+        assert len(http.max_origin_connections) == 0
+
+
+@pytest.mark.asyncio
+async def test_hard_limit_per_origin_within_hard_limit(server):
+    """
+    Requests that are within their per-origin limit should still be subject
+    to the hard_limit for the pool as a whole.
+    """
+    pool_limits = httpx.PoolLimits(
+        hard_limit=1, hard_limit_per_origin=1, pool_timeout=0.000001
+    )
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+
+        with pytest.raises(httpx.PoolTimeout):
+            await http.request("GET", "http://localhost:8000/")
+
+        await response.read()
+        assert list(http.max_origin_connections) == [
+            httpx.Origin("http://127.0.0.1:8000")
+        ]
+
+
+@pytest.mark.asyncio
+async def test_soft_limit_per_origin(server):
+    """
+    The soft_limit_per_origin config should limit the maximum number of
+    keep-alive connections to a single origin.
+    """
+    pool_limits = httpx.PoolLimits(soft_limit_per_origin=1)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response_a = await http.request("GET", "http://127.0.0.1:8000/")
+        response_b = await http.request("GET", "http://127.0.0.1:8000/")
+        response_c = await http.request("GET", "http://localhost:8000/")
+        await response_a.read()
+        await response_b.read()
+        await response_c.read()
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_stats(server):
+    """
+    The pool should report the state of its connections, and count
+    connection events.
+    """
+    origin = "http://127.0.0.1:8000"
+    pool_limits = httpx.PoolLimits(soft_limit=1, hard_limit_per_origin=10)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response_a = await http.request("GET", "http://127.0.0.1:8000/")
+        response_b = await http.request("GET", "http://127.0.0.1:8000/")
+        stats = http.stats()
+        assert stats["active"] == 2
+        assert stats["idle"] == 0
+        assert stats["waiters"] == 0
+        assert stats["http_versions"] == {"HTTP/1.1": 2, "HTTP/2": 0}
+        assert stats["origins"] == {origin: {"active": 2, "idle": 0, "waiters": 0}}
+
+        await response_a.read()
+        await response_b.read()
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        stats = http.stats()
+        assert stats["active"] == 0
+        assert stats["idle"] == 1
+        assert stats["origins"] == {origin: {"active": 0, "idle": 1, "waiters": 0}}
+        assert stats["connections_created"] == 2
+        assert stats["connections_reused"] == 1
+        assert stats["connections_dropped"] == 0
+        assert stats["connections_expired"] == 0
+        assert stats["connections_closed_over_soft_limit"] == 1
+        assert stats["pool_wait_time"]["count"] == 3
+        assert sum(stats["pool_wait_time"]["buckets"].values()) == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_waiters(server):
+    """
+    The pool should report the number of requests waiting for a connection.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit=1, hard_limit_per_origin=1)
+
+    headers = [(b"connection", b"close")]
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/", headers=headers)
+        waiting = [
+            asyncio.ensure_future(
+                http.request("GET", "http://127.0.0.1:8000/", headers=headers)
+            ),
+            asyncio.ensure_future(
+                http.request("GET", "http://localhost:8000/", headers=headers)
+            ),
+        ]
+        await asyncio.sleep(0.01)
+        stats = http.stats()
+        assert stats["waiters"] == 2
+        assert stats["origins"]["http://127.0.0.1:8000"]["waiters"] == 1
+        assert stats["origins"]["http://localhost:8000"] == {
+            "active": 0,
+            "idle": 0,
+            "waiters": 1,
+        }
+
+        # The request to localhost already holds its per-origin slot, so it is
+        # granted the pool-wide slot first.
+        await response.read()
+        for future in reversed(waiting):
+            response = await future
+            await response.read()
+        assert http.stats()["waiters"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_records_pool_timeouts(server):
+    """
+    Waits that end in a `PoolTimeout` should still be recorded.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit=1, pool_timeout=0.000001)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        with pytest.raises(httpx.PoolTimeout):
+            await http.request("GET", "http://localhost:8000/")
+        await response.read()
+
+        stats = http.stats()
+        assert stats["pool_wait_time"]["count"] == 2
+        assert stats["connections_created"] == 1
+        assert stats["waiters"] == 0
+
+
+@pytest.mark.asyncio
+async def test_preconnect(server):
+    """
+    Preconnected connections should be kept alive, ready for reuse.
+    """
+    async with httpx.ConnectionPool() as http:
+        await http.preconnect("http://127.0.0.1:8000/", count=2)
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 2
+        assert http.stats()["connections_created"] == 2
+
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        assert len(http.keepalive_connections) == 2
+        assert http.stats()["connections_created"] == 2
+        assert http.stats()["connections_reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_preconnect_failure():
+    """
+    Connection failures should be raised, without holding on to any slots.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit=2)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        with pytest.raises(OSError):
+            await http.preconnect("http://127.0.0.1:8002/", count=2)
+        assert len(http.keepalive_connections) == 0
+        assert http.max_connections.value == 2
+
+
+@pytest.mark.asyncio
+async def test_preconnect_cancelled(server):
+    """
+    Cancelling a preconnect should cancel any connections still pending.
+    """
+    pool_limits = httpx.PoolLimits(hard_limit=1)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        preconnect = asyncio.ensure_future(http.preconnect("http://127.0.0.1:8000/"))
+        await asyncio.sleep(0.01)
+        assert http.stats()["waiters"] == 1
+
+        preconnect.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await preconnect
+        await asyncio.sleep(0)
+        assert http.stats()["waiters"] == 0
+        await response.read()
+
+
+@pytest.mark.asyncio
+async def test_ssl_session_resumption(https_server):
+    """
+    New TLS connections to an origin should resume an earlier TLS session.
+    """
+    url = "https://127.0.0.1:8001/"
+    headers = [(b"connection", b"close")]
+
+    async with httpx.ConnectionPool(verify=False) as http:
+        for _ in range(2):
+            response = await http.request("GET", url, headers=headers)
+            await response.read()
+
+        stats = http.stats()
+        assert stats["connections_created"] == 2
+        assert stats["ssl_session_hits"] == 1
+        assert stats["ssl_session_misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ssl_session_not_shared_across_contexts(
+    https_server, cert_pem_file, cert_private_key_file
+):
+    url = "https://127.0.0.1:8001/"
+    headers = [(b"connection", b"close")]
+
+    async with httpx.ConnectionPool(verify=False) as http:
+        response = await http.request("GET", url, headers=headers)
+        await response.read()
+
+        # A different SSL configuration means a different SSL context.
+        cert = (cert_pem_file, cert_private_key_file)
+        response = await http.request("GET", url, headers=headers, cert=cert)
+        await response.read()
+
+        stats = http.stats()
+        assert stats["ssl_session_hits"] == 0
+        assert stats["ssl_session_misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connects_to_http11_origin(https_server):
+    """
+    Once an origin is known to only speak HTTP/1.1, requests to it should no
+    longer wait for each other's connections.
+    """
+    url = "https://127.0.0.1:8001/"
+
+    async with httpx.ConnectionPool(verify=False) as http:
+        responses = await asyncio.gather(*[http.request("GET", url) for _ in range(3)])
+        origin = responses[0].request.url.origin
+        assert http.origin_http_versions[origin] == "HTTP/1.1"
+        assert len(http.active_connections) == 3
+        assert not http.may_be_http2(origin)
+
+        for response in responses:
+            await response.read()
+
+
+@pytest.mark.asyncio
+async def test_http11_only_pool_does_not_coalesce_connects(https_server):
+    url = "https://127.0.0.1:8001/"
+
+    async with httpx.ConnectionPool(verify=False, http_versions="HTTP/1.1") as http:
+        response = await http.request("GET", url)
+        assert not http.may_be_http2(response.request.url.origin)
+        await response.read()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_connect_failure():
+    """
+    A failed connection attempt should release its slot, and let any other
+    waiting requests try again.
+    """
+    url = "https://127.0.0.1:8002/"
+    pool_limits = httpx.PoolLimits(hard_limit=2)
+
+    async with httpx.ConnectionPool(pool_limits=pool_limits) as http:
+        results = await asyncio.gather(
+            *[http.request("GET", url) for _ in range(2)], return_exceptions=True
+        )
+        assert all(isinstance(result, OSError) for result in results)
+        assert http.pending_connections == {}
+        assert http.max_connections.value == 2
+
+
+@pytest.mark.asyncio
+async def test_pipelined_requests(server):
+    """
+    With pipelining enabled, concurrent GET requests should share a single
+    connection, and each receive their own response.
+    """
+    urls = ["http://127.0.0.1:8000/", "http://127.0.0.1:8000/status/404"] * 2
+
+    async with httpx.ConnectionPool(pipeline_depth=4) as http:
+        responses = await asyncio.gather(*[http.request("GET", url) for url in urls])
+        assert len(http.active_connections) == 1
+        assert http.stats()["connections_created"] == 1
+
+        for response in responses:
+            await response.read()
+        assert [response.status_code for response in responses] == [200, 404] * 2
+        assert responses[0].content == b"Hello, world!"
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 1
+
+        # Requests with a body are never pipelined.
+        response = await http.request("POST", "http://127.0.0.1:8000/", data=b"")
+        response_2 = await http.request("GET", "http://127.0.0.1:8000/")
+        assert len(http.active_connections) == 2
+        await response.read()
+        await response_2.read()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_depth(server):
+    async with httpx.ConnectionPool(pipeline_depth=2) as http:
+        url = "http://127.0.0.1:8000/"
+        responses = await asyncio.gather(*[http.request("GET", url) for _ in range(3)])
+        assert http.stats()["connections_created"] == 2
+
+        for response in responses:
+            await response.read()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_requests_replayed():
+    """
+    Pipelined requests left unanswered when the server closes the connection
+    should be sent again on a new connection.
+    """
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nOK")
+        writer.write_eof()
+        while await reader.read(4096):
+            pass
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 8003)
+    try:
+        async with httpx.ConnectionPool(pipeline_depth=3) as http:
+            url = "http://127.0.0.1:8003/"
+            responses = await asyncio.gather(
+                *[http.request("GET", url) for _ in range(3)]
+            )
+            for response in responses:
+                await response.read()
+                assert response.content == b"OK"
+
+            stats = http.stats()
+            assert stats["connections_created"] == 3
+            assert stats["requests_replayed"] == 3
+            assert len(http.active_connections) == 0
+            assert http.max_connections.value == http.pool_limits.hard_limit
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_request_timeout(server):
+    """
+    A pipelined request that times out should not be replayed, while any
+    requests behind it can be.
+    """
+    url = "http://127.0.0.1:8000/slow_response"
+    timeout = httpx.TimeoutConfig(read_timeout=0.05)
+
+    async with httpx.ConnectionPool(pipeline_depth=2) as http:
+        results = await asyncio.gather(
+            *[http.request("GET", url, timeout=timeout) for _ in range(2)],
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], httpx.ReadTimeout)
+        assert isinstance(results[1], httpx.ReadTimeout)
+        assert http.stats()["requests_replayed"] == 1
+        assert len(http.active_connections) == 0
+
+
+def test_pipelining_requires_h11():
+    with pytest.raises(ValueError):
+        httpx.ConnectionPool(pipeline_depth=2, http11_parser="httptools")
@@ -1,5 +1,6 @@
 import pytest
 
+import httpx
 from httpx import HTTPConnection
 
 
@@ -21,6 +22,71 @@ async def test_post(server):
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_small_request_sent_in_single_write(server):
+    conn = HTTPConnection(origin="http://127.0.0.1:8000/")
+    response = await conn.request("GET", "http://127.0.0.1:8000/")
+    await response.read()
+
+    stream = conn.h11_connection.stream
+    writes = []
+
+    async def write(data, timeout=None, flag=None):
+        writes.append(data)
+        stream.write_no_block(data)
+
+    stream.write = write
+    response = await conn.request(
+        "POST", "http://127.0.0.1:8000/echo_body", data=b"Hello, world!"
+    )
+    await response.read()
+    assert response.content == b"Hello, world!"
+    assert len(writes) == 1
+    assert writes[0].endswith(b"\r\n\r\nHello, world!")
+    await conn.close()
+
+
+@pytest.mark.asyncio
+async def test_streaming_request_drains_in_batches(server):
+    conn = HTTPConnection(origin="http://127.0.0.1:8000/")
+    response = await conn.request("GET", "http://127.0.0.1:8000/")
+    await response.read()
+
+    stream = conn.h11_connection.stream
+    original_write = stream.write
+    drains = []
+
+    async def write(data, timeout=None, flag=None):
+        drains.append(data)
+        await original_write(data, timeout, flag)
+
+    async def data():
+        for _ in range(100):
+            yield b"x" * 1024
+
+    stream.write = write
+    response = await conn.request(
+        "POST", "http://127.0.0.1:8000/echo_body", data=data()
+    )
+    await response.read()
+    assert response.content == b"x" * 100 * 1024
+    # The request head, one drain once 64KB has been written, and the end of
+    # the request body.
+    assert len(drains) == 3
+    await conn.close()
+
+
+@pytest.mark.asyncio
+async def test_read_size_grows_for_large_responses(server):
+    conn = HTTPConnection(origin="http://127.0.0.1:8000/")
+    data = b"x" * 1024 * 1024
+    response = await conn.request("POST", "http://127.0.0.1:8000/echo_body", data=data)
+    await response.read()
+    assert response.content == data
+    assert conn.h11_connection.read_size.value > conn.h11_connection.READ_NUM_BYTES
+    await conn.close()
+
+
 @pytest.mark.asyncio
 async def test_https_get_with_ssl_defaults(https_server):
     """
@@ -43,3 +109,26 @@ async def test_https_get_with_sll_overrides(https_server):
     await response.read()
     assert response.status_code == 200
     assert response.content == b"Hello, world!"
+
+
+@pytest.mark.asyncio
+async def test_https_ssl_context_is_cached(https_server, monkeypatch):
+    """
+    Connections with the same SSL configuration should share an SSL context.
+    """
+    monkeypatch.setattr(httpx.config, "SSL_CONTEXT_CACHE", {})
+    contexts = []
+    for _ in range(2):
+        conn = HTTPConnection(origin="https://127.0.0.1:8001/", verify=False)
+        contexts.append(await conn.get_ssl_context(conn.ssl))
+    assert contexts[0] is contexts[1]
+
+
+@pytest.mark.asyncio
+async def test_http_version(server):
+    conn = HTTPConnection(origin="http://127.0.0.1:8000/")
+    assert conn.http_version is None
+
+    response = await conn.request("GET", "http://127.0.0.1:8000/")
+    await response.read()
+    assert conn.http_version == "HTTP/1.1"
@@ -1,6 +1,9 @@
+import asyncio
 import json
 
-from httpx import Client, Response
+import pytest
+
+from httpx import Client, ConnectionPool, Response
 
 from .utils import MockHTTP2Backend
 
@@ -76,3 +79,88 @@ def test_http2_reconnect():
 
     assert response_2.status_code == 200
     assert json.loads(response_2.content) == {"method": "GET", "path": "/2", "body": ""}
+
+
+@pytest.mark.asyncio
+async def test_http2_pool_stats():
+    backend = MockHTTP2Backend(app=app)
+
+    async with ConnectionPool(backend=backend) as http:
+        response = await http.request("GET", "http://example.org")
+        assert http.stats()["http_versions"] == {"HTTP/1.1": 0, "HTTP/2": 1}
+        await response.read()
+
+
+@pytest.mark.asyncio
+async def test_http2_max_concurrent_streams():
+    """
+    Once a connection reaches the server's limit on concurrent streams, the
+    pool should open another connection.
+    """
+    backend = MockHTTP2Backend(app=app, max_concurrent_streams=1)
+
+    async with ConnectionPool(backend=backend) as http:
+        response_1 = await http.request("GET", "http://example.org/1")
+        response_2 = await http.request("GET", "http://example.org/2")
+        assert len(http.active_connections) == 2
+
+        await response_1.read()
+        await response_2.read()
+        assert len(http.active_connections) == 0
+        assert len(http.keepalive_connections) == 2
+
+
+@pytest.mark.asyncio
+async def test_http2_least_loaded_connection():
+    """
+    Requests should be sent on the HTTP/2 connection with the fewest
+    streams open, rather than the first with any room left.
+    """
+    backend = MockHTTP2Backend(app=app, max_concurrent_streams=3)
+
+    async with ConnectionPool(backend=backend) as http:
+        responses = [
+            await http.request("GET", f"http://example.org/{n}") for n in range(7)
+        ]
+        a, b, c = http.active_connections
+        assert a.is_http2 and b.is_http2 and c.is_http2
+        assert [conn.num_open_streams for conn in (a, b, c)] == [3, 3, 1]
+
+        await responses[0].read()
+        await responses[3].read()
+        assert [conn.num_open_streams for conn in (a, b, c)] == [2, 2, 1]
+
+        responses.append(await http.request("GET", "http://example.org/7"))
+        assert [conn.num_open_streams for conn in (a, b, c)] == [2, 2, 2]
+
+        for response in responses:
+            await response.read()
+
+
+class SlowConnectBackend(MockHTTP2Backend):
+    def __init__(self, app):
+        super().__init__(app)
+        self.num_connects = 0
+
+    async def connect(self, *args, **kwargs):
+        self.num_connects += 1
+        await asyncio.sleep(0.01)
+        return await super().connect(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_http2_concurrent_connects_are_coalesced():
+    """
+    Concurrent requests to a new origin that may speak HTTP/2 should wait
+    for a single connection, and then share it.
+    """
+    backend = SlowConnectBackend(app=app)
+
+    async with ConnectionPool(backend=backend) as http:
+        requests = [http.request("GET", f"https://example.org/{n}") for n in range(5)]
+        responses = await asyncio.gather(*requests)
+        assert backend.num_connects == 1
+        assert len(http.active_connections) == 1
+
+        for response in responses:
+            await response.read()
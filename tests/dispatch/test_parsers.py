@@ -0,0 +1,205 @@
+import h11
+import pytest
+
+import httpx
+from httpx import HTTPConnection
+from httpx.dispatch.parsers import HttpToolsParser, get_http11_parser
+
+
+def send_request(parser, method=b"GET", headers=None):
+    headers = [(b"host", b"example.org")] if headers is None else headers
+    request = h11.Request(method=method, target=b"/", headers=headers)
+    data = parser.send(request)
+    data += parser.send(h11.EndOfMessage())
+    return data
+
+
+def receive_events(parser, data):
+    parser.receive_data(data)
+    events = []
+    while True:
+        event = parser.next_event()
+        if event is h11.NEED_DATA:
+            return events
+        events.append(event)
+
+
+@pytest.mark.asyncio
+async def test_httptools_get(server):
+    conn = HTTPConnection(origin="http://127.0.0.1:8000/", http11_parser="httptools")
+    for _ in range(2):
+        response = await conn.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        assert response.status_code == 200
+        assert response.http_version == "HTTP/1.1"
+        assert response.headers["content-type"] == "text/plain"
+        assert response.content == b"Hello, world!"
+
+    # Both requests were sent over the same connection.
+    assert isinstance(conn.h11_connection.h11_state, HttpToolsParser)
+    assert not conn.is_closed
+    await conn.close()
+    assert conn.is_closed
+
+
+@pytest.mark.asyncio
+async def test_httptools_post(server):
+    async def data():
+        yield b"Hello, "
+        yield b"world!"
+
+    async with httpx.ConnectionPool(http11_parser="httptools") as http:
+        url = "http://127.0.0.1:8000/echo_body"
+        for content in (b"Hello, world!", data()):
+            response = await http.request("POST", url, data=content)
+            await response.read()
+            assert response.content == b"Hello, world!"
+        assert http.stats()["connections_created"] == 1
+
+
+@pytest.mark.asyncio
+async def test_httptools_head(server):
+    async with httpx.ConnectionPool(http11_parser="httptools") as http:
+        response = await http.request("HEAD", "http://127.0.0.1:8000/")
+        await response.read()
+        assert response.status_code == 200
+        assert response.content == b""
+
+        response = await http.request("GET", "http://127.0.0.1:8000/")
+        await response.read()
+        assert response.content == b"Hello, world!"
+        assert http.stats()["connections_reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_httptools_connection_close(server):
+    async with httpx.ConnectionPool(http11_parser="httptools") as http:
+        headers = [(b"connection", b"close")]
+        response = await http.request("GET", "http://127.0.0.1:8000/", headers=headers)
+        await response.read()
+        assert len(http.keepalive_connections) == 0
+
+
+def test_httptools_request_serialization():
+    parser = HttpToolsParser()
+    headers = [(b"host", b"example.org"), (b"transfer-encoding", b"chunked")]
+    request = h11.Request(method=b"POST", target=b"/path", headers=headers)
+
+    assert parser.send(request) == (
+        b"POST /path HTTP/1.1\r\n"
+        b"host: example.org\r\n"
+        b"transfer-encoding: chunked\r\n"
+        b"\r\n"
+    )
+    assert parser.send(h11.Data(data=b"Hello")) == b"5\r\nHello\r\n"
+    assert parser.send(h11.Data(data=b"")) == b""
+    assert parser.send(h11.EndOfMessage()) == b"0\r\n\r\n"
+    assert parser.our_state is h11.DONE
+
+    with pytest.raises(h11.LocalProtocolError):
+        parser.send(request)
+
+
+def test_httptools_informational_response():
+    parser = HttpToolsParser()
+    send_request(parser)
+    events = receive_events(
+        parser,
+        b"HTTP/1.1 100 Continue\r\n\r\n"
+        b"HTTP/1.1 200 OK\r\ncontent-length: 2\r\n\r\nhi",
+    )
+    assert [type(event) for event in events] == [
+        h11.InformationalResponse,
+        h11.Response,
+        h11.Data,
+        h11.EndOfMessage,
+    ]
+    assert events[0].status_code == 100
+    assert events[1].reason == b"OK"
+    assert parser.their_state is h11.DONE
+
+    parser.start_next_cycle()
+    assert parser.our_state is h11.IDLE
+
+
+def test_httptools_close_delimited_response():
+    parser = HttpToolsParser()
+    send_request(parser)
+    events = receive_events(parser, b"HTTP/1.1 200 OK\r\n\r\nHello")
+    assert [type(event) for event in events] == [h11.Response, h11.Data]
+
+    events = receive_events(parser, b"")
+    assert [type(event) for event in events] == [h11.EndOfMessage]
+    assert parser.our_state is h11.MUST_CLOSE
+    assert parser.their_state is h11.MUST_CLOSE
+
+    with pytest.raises(h11.LocalProtocolError):
+        parser.start_next_cycle()
+
+
+def test_httptools_http_10_response():
+    parser = HttpToolsParser()
+    send_request(parser)
+    events = receive_events(parser, b"HTTP/1.0 204 No Content\r\n\r\n")
+    assert [type(event) for event in events] == [h11.Response, h11.EndOfMessage]
+    assert events[0].http_version == b"1.0"
+    assert parser.their_state is h11.MUST_CLOSE
+
+
+def test_httptools_connection_closed_while_idle():
+    parser = HttpToolsParser()
+    send_request(parser)
+    receive_events(parser, b"HTTP/1.1 200 OK\r\ncontent-length: 0\r\n\r\n")
+    parser.start_next_cycle()
+
+    events = receive_events(parser, b"")
+    assert [type(event) for event in events] == [h11.ConnectionClosed]
+    assert parser.their_state is h11.CLOSED
+
+
+def test_httptools_incomplete_response():
+    parser = HttpToolsParser()
+    send_request(parser)
+    receive_events(parser, b"HTTP/1.1 200 OK\r\ncontent-length: 10\r\n\r\nHello")
+
+    with pytest.raises(h11.RemoteProtocolError):
+        parser.receive_data(b"")
+    assert parser.their_state is h11.ERROR
+
+
+def test_httptools_invalid_response():
+    parser = HttpToolsParser()
+    send_request(parser)
+
+    with pytest.raises(h11.RemoteProtocolError):
+        parser.receive_data(b"Not HTTP\r\n\r\n")
+    assert parser.their_state is h11.ERROR
+
+
+def test_httptools_data_outside_of_response():
+    parser = HttpToolsParser()
+    send_request(parser, method=b"HEAD")
+    events = receive_events(parser, b"HTTP/1.1 200 OK\r\ncontent-length: 5\r\n\r\n")
+    assert [type(event) for event in events] == [h11.Response, h11.EndOfMessage]
+    # Stray data after a HEAD response is ignored...
+    assert receive_events(parser, b"Hello") == []
+
+    # ...but is otherwise a protocol error.
+    parser = HttpToolsParser()
+    with pytest.raises(h11.RemoteProtocolError):
+        parser.receive_data(b"HTTP/1.1 200 OK\r\n\r\n")
+
+
+def test_httptools_send_failed():
+    parser = HttpToolsParser()
+    parser.send_failed()
+    assert parser.our_state is h11.ERROR
+    assert parser.send(h11.ConnectionClosed()) == b""
+    assert parser.our_state is h11.CLOSED
+
+
+def test_get_http11_parser():
+    assert isinstance(get_http11_parser("h11"), h11.Connection)
+    assert isinstance(get_http11_parser("httptools"), HttpToolsParser)
+    with pytest.raises(ValueError):
+        get_http11_parser("invalid")
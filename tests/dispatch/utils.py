@@ -5,13 +5,15 @@ import typing
 import h2.config
 import h2.connection
 import h2.events
+import h2.settings
 
 from httpx import AsyncioBackend, BaseStream, Request, TimeoutConfig
 
 
 class MockHTTP2Backend(AsyncioBackend):
-    def __init__(self, app):
+    def __init__(self, app, max_concurrent_streams=None):
         self.app = app
+        self.max_concurrent_streams = max_concurrent_streams
         self.server = None
 
     async def connect(
@@ -20,13 +22,14 @@ class MockHTTP2Backend(AsyncioBackend):
         port: int,
         ssl_context: typing.Optional[ssl.SSLContext],
         timeout: TimeoutConfig,
+        ssl_session: ssl.SSLSession = None,
     ) -> BaseStream:
-        self.server = MockHTTP2Server(self.app)
+        self.server = MockHTTP2Server(self.app, self.max_concurrent_streams)
         return self.server
 
 
 class MockHTTP2Server(BaseStream):
-    def __init__(self, app):
+    def __init__(self, app, max_concurrent_streams=None):
         config = h2.config.H2Configuration(client_side=False)
         self.conn = h2.connection.H2Connection(config=config)
         self.app = app
@@ -34,11 +37,23 @@ class MockHTTP2Server(BaseStream):
         self.requests = {}
         self.close_connection = False
 
+        if max_concurrent_streams is not None:
+            self.conn.initiate_connection()
+            setting = h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS
+            self.conn.update_settings({setting: max_concurrent_streams})
+            self.buffer += self.conn.data_to_send()
+
     # Stream interface
 
     def get_http_version(self) -> str:
         return "HTTP/2"
 
+    def get_ssl_session(self) -> typing.Optional[ssl.SSLSession]:
+        return None
+
+    def is_ssl_session_reused(self) -> bool:
+        return False
+
     async def read(self, n, timeout, flag=None) -> bytes:
         await asyncio.sleep(0)
         send, self.buffer = self.buffer[:n], self.buffer[n:]
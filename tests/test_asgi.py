@@ -63,3 +63,10 @@ def test_asgi_exc_after_response():
     client = httpx.Client(app=raise_exc_after_response)
     with pytest.raises(ValueError):
         client.get("http://www.example.org/")
+
+
+def test_asgi_preconnect():
+    client = httpx.Client(app=hello_world)
+    client.preconnect("http://www.example.org/")
+    response = client.get("http://www.example.org/")
+    assert response.status_code == 200
@@ -85,6 +85,21 @@ def test_load_ssl_context():
     assert repr(ssl_config) == "SSLConfig(cert=None, verify=True)"
 
 
+def test_ssl_context_cache(monkeypatch):
+    monkeypatch.setattr(httpx.config, "SSL_CONTEXT_CACHE", {})
+    http2 = httpx.HTTPVersionConfig("HTTP/2")
+
+    assert httpx.SSLConfig().get_cached_ssl_context() is None
+    context = httpx.SSLConfig().load_ssl_context()
+    assert httpx.SSLConfig().load_ssl_context() is context
+    assert httpx.SSLConfig().get_cached_ssl_context() is context
+    assert httpx.SSLConfig().with_overrides(verify=True).load_ssl_context() is context
+
+    assert httpx.SSLConfig().load_ssl_context(http2) is not context
+    assert httpx.SSLConfig(verify=False).load_ssl_context() is not context
+    assert len(httpx.config.SSL_CONTEXT_CACHE) == 3
+
+
 def test_ssl_repr():
     ssl = httpx.SSLConfig(verify=False)
     assert repr(ssl) == "SSLConfig(cert=None, verify=False)"
@@ -140,11 +155,19 @@ def test_timeout_repr():
         == "TimeoutConfig(connect_timeout=None, read_timeout=5.0, write_timeout=None)"
     )
 
+    timeout = httpx.TimeoutConfig(timeout=5.0, total_timeout=30.0)
+    assert repr(timeout) == (
+        "TimeoutConfig(connect_timeout=5.0, read_timeout=5.0, write_timeout=5.0, "
+        "total_timeout=30.0)"
+    )
+
 
 def test_limits_repr():
     limits = httpx.PoolLimits(hard_limit=100)
-    assert (
-        repr(limits) == "PoolLimits(soft_limit=None, hard_limit=100, pool_timeout=None)"
+    assert repr(limits) == (
+        "PoolLimits(soft_limit=None, hard_limit=100, pool_timeout=None, "
+        "keepalive_expiry=None, soft_limit_per_origin=None, "
+        "hard_limit_per_origin=None)"
     )
 
 
@@ -171,3 +194,7 @@ def test_timeout_from_tuple():
 def test_timeout_from_config_instance():
     timeout = httpx.TimeoutConfig(timeout=5.0)
     assert httpx.TimeoutConfig(timeout) == httpx.TimeoutConfig(timeout=5.0)
+
+    timeout = httpx.TimeoutConfig(timeout=5.0, total_timeout=30.0)
+    assert httpx.TimeoutConfig(timeout) == timeout
+    assert httpx.TimeoutConfig(timeout) != httpx.TimeoutConfig(timeout=5.0)
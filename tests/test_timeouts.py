@@ -7,6 +7,7 @@ from httpx import (
     PoolTimeout,
     ReadTimeout,
     TimeoutConfig,
+    TotalTimeout,
     WriteTimeout,
 )
 
@@ -51,3 +52,30 @@ async def test_pool_timeout(server):
             await client.get("http://localhost:8000/")
 
         await response.read()
+
+
+@pytest.mark.asyncio
+async def test_total_timeout(server):
+    timeout = TimeoutConfig(timeout=5.0, total_timeout=0.05)
+
+    async with AsyncClient(timeout=timeout) as client:
+        with pytest.raises(TotalTimeout):
+            await client.get("http://127.0.0.1:8000/slow_response")
+
+        # The connection pool is left in a usable state.
+        response = await client.get("http://127.0.0.1:8000/")
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_total_timeout_per_request(server):
+    async with AsyncClient() as client:
+        timeout = TimeoutConfig(timeout=5.0, total_timeout=0.05)
+        with pytest.raises(TotalTimeout):
+            await client.get("http://127.0.0.1:8000/slow_response", timeout=timeout)
+
+        timeout = TimeoutConfig(timeout=5.0, total_timeout=5.0)
+        response = await client.get(
+            "http://127.0.0.1:8000/slow_response", timeout=timeout
+        )
+        assert response.status_code == 200
@@ -2,7 +2,12 @@ import os
 
 import pytest
 
-from httpx.utils import get_netrc_login, guess_json_utf, parse_header_links
+from httpx.utils import (
+    ReadSize,
+    get_netrc_login,
+    guess_json_utf,
+    parse_header_links,
+)
 
 
 @pytest.mark.parametrize(
@@ -87,3 +92,21 @@ def test_get_netrc_login():
 )
 def test_parse_header_links(value, expected):
     assert parse_header_links(value) == expected
+
+
+def test_read_size():
+    read_size = ReadSize(initial=1024, maximum=4096)
+
+    # Full reads double the read size, up to the maximum.
+    for expected in (2048, 4096, 4096):
+        read_size.update(read_size.value)
+        assert read_size.value == expected
+
+    # Reads that are a little short leave the read size alone...
+    read_size.update(2048)
+    assert read_size.value == 4096
+
+    # ...but reads well short of it halve it, down to the initial size.
+    for expected in (2048, 1024, 1024):
+        read_size.update(10)
+        assert read_size.value == expected